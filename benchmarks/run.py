@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""Benchmark the assembler, codec, execution engines and web endpoint.
+
+    python3 benchmarks/run.py --size 20000 --json results.json
+    python3 benchmarks/run.py --compare results.json
+
+Each stage is timed separately on every synthetic workload; the minimum of
+--repeat runs is reported. With --compare the script exits with status 1
+if any stage got slower than the baseline by more than --threshold.
+"""
+
+import argparse
+import http.client
+import json
+import platform
+import statistics
+import sys
+import threading
+import time
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+for path in (ROOT, SRC):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+import web_server
+from assembler_ir import parse_program
+from decode import decode_instr
+from encode import encode_program
+from engine import BACKENDS, execute, load
+from predecode import predecode
+from vm import VM
+from workloads import GENERATORS, Workload
+
+
+def measure(func, repeat: int) -> dict:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return {"min": min(times), "median": statistics.median(times)}
+
+
+def bench_workload(workload: Workload, repeat: int, port: int | None) -> dict:
+    source = workload.source
+    program = parse_program(source)
+    compact = parse_program(source, compact=True)
+    binary = encode_program(program)
+    words = [binary[i : i + 11] for i in range(0, len(binary), 11)]
+
+    stages = {
+        "parse_program": lambda: parse_program(source),
+        "parse_program:compact": lambda: parse_program(source, compact=True),
+        "encode_program": lambda: encode_program(program),
+        "encode_program:compact": lambda: encode_program(compact),
+        "decode_instr": lambda: [decode_instr(word) for word in words],
+        "predecode": lambda: predecode(binary),
+    }
+    for name in BACKENDS:
+        prepared = load(binary, name)
+        stages[f"execute:{name}"] = (
+            lambda name=name, prepared=prepared: execute(
+                prepared, VM(**workload.vm_options), name
+            )
+        )
+    if port is not None and workload.web:
+        body = json.dumps({"source": source, "dumpStart": 0, "dumpEnd": 2048})
+        stages["web:/api/run"] = lambda: _post_run(port, body.encode("utf-8"))
+
+    return {name: measure(func, repeat) for name, func in stages.items()}
+
+
+def _post_run(port: int, body: bytes):
+    # Clearing the caches makes every request assemble and run from scratch.
+    web_server.PROGRAM_CACHE.clear()
+    web_server.RESULT_CACHE.clear()
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    conn.request("POST", "/api/run", body, {"Content-Type": "application/json"})
+    response = conn.getresponse()
+    response.read()
+    conn.close()
+    if response.status != 200:
+        raise RuntimeError(f"/api/run returned {response.status}")
+
+
+def start_server():
+    handler = web_server.UVMRequestHandler
+    handler.max_instructions = handler.run_timeout = None
+    handler.log_message = lambda *args: None
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> bool:
+    """Print per-stage ratios against a baseline; True if nothing regressed."""
+    ok = True
+    for workload, stages in results.items():
+        for stage, timing in stages.items():
+            base = baseline.get(workload, {}).get(stage)
+            if base is None:
+                continue
+            ratio = timing["min"] / base["min"]
+            flag = ""
+            if ratio > 1 + threshold:
+                flag, ok = "  REGRESSION", False
+            print(f"{workload:8} {stage:22} {ratio:6.2f}x{flag}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="UVM benchmarks")
+    parser.add_argument("--size", type=int, default=20000, help="Instructions")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--workloads",
+        nargs="+",
+        choices=sorted(GENERATORS),
+        default=sorted(GENERATORS),
+    )
+    parser.add_argument("--no-web", action="store_true", help="Skip /api/run")
+    parser.add_argument("--json", help="Write results to this file")
+    parser.add_argument("--compare", help="Baseline JSON written by --json")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="Slowdown that counts as a regression (default 0.10)",
+    )
+    args = parser.parse_args()
+
+    server = None if args.no_web else start_server()
+    port = None if server is None else server.server_address[1]
+
+    results = {}
+    try:
+        for name in args.workloads:
+            workload = GENERATORS[name](args.size, args.seed)
+            results[name] = bench_workload(workload, args.repeat, port)
+            for stage, timing in results[name].items():
+                per_instr = timing["min"] / workload.instructions * 1e9
+                print(
+                    f"{name:8} {stage:22} {timing['min'] * 1e3:10.2f} ms"
+                    f" {per_instr:10.1f} ns/instr"
+                )
+    finally:
+        if server is not None:
+            server.shutdown()
+
+    if args.json:
+        report = {
+            "meta": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "size": args.size,
+                "seed": args.seed,
+                "repeat": args.repeat,
+            },
+            "results": results,
+        }
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        print("\n----- vs baseline -----")
+        if not compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Synthetic UVM programs for the benchmark suite.
+
+Every generator is deterministic for a given (size, seed) and only emits
+programs that run without faulting: pointer cells are initialised before
+they are dereferenced and never overwritten with data.
+"""
+
+import random
+from dataclasses import dataclass, field
+
+# Dense layout used by the mixed workload (fits the default 2048-word VM).
+_HANDLES = range(0, 16)  # hold addresses of pointer cells, used by STORE
+_POINTERS = range(16, 80)  # hold data addresses, used by LOAD and BITREV
+_DATA = range(128, 1920)  # BITREV may read up to 127 words past a pointer
+
+_WIDE_SPREAD = 1 << 26
+
+
+@dataclass
+class Workload:
+    name: str
+    source: str
+    instructions: int
+    vm_options: dict = field(default_factory=dict)
+
+    @property
+    def web(self) -> bool:
+        """Whether the program fits the web endpoint's default VM."""
+        return not self.vm_options
+
+
+def _prologue(rng: random.Random) -> list[str]:
+    lines = [f"CONST {rng.choice(_POINTERS)}, {h}" for h in _HANDLES]
+    lines += [f"CONST {rng.choice(_DATA)}, {p}" for p in _POINTERS]
+    return lines
+
+
+def opcode_mix(size: int, seed: int = 0) -> Workload:
+    """Roughly equal parts CONST, LOAD, STORE and BITREV over dense memory."""
+    rng = random.Random(seed)
+    lines = _prologue(rng)
+    while len(lines) < size:
+        kind = rng.randrange(5)
+        if kind == 0:
+            lines.append(f"CONST {rng.getrandbits(23)}, {rng.choice(_DATA)}")
+        elif kind == 1:
+            lines.append(f"CONST {rng.choice(_DATA)}, {rng.choice(_POINTERS)}")
+        elif kind == 2:
+            lines.append(f"LOAD {rng.choice(_POINTERS)}, {rng.choice(_DATA)}")
+        elif kind == 3:
+            lines.append(f"STORE {rng.choice(_POINTERS)}, {rng.choice(_HANDLES)}")
+        else:
+            b, d, c = rng.choice(_POINTERS), rng.randrange(128), rng.choice(_DATA)
+            lines.append(f"BITREV {b}, {d}, {c}")
+    return Workload("mix", "\n".join(lines) + "\n", len(lines))
+
+
+def bitrev_vectors(size: int, seed: int = 0, width: int = 64) -> Workload:
+    """vec9.asm scaled up: fill vectors, then bit-reverse them element-wise."""
+    rng = random.Random(seed)
+    src_ptr, dst_base, src_base = 10, 1024, 128
+    lines = [f"CONST {src_base}, {src_ptr}"]
+    while len(lines) < size:
+        for i in range(width):
+            lines.append(f"CONST {rng.getrandbits(23)}, {src_base + i}")
+        for i in range(width):
+            lines.append(f"BITREV {src_ptr}, {i}, {dst_base + i}")
+    del lines[size:]
+    return Workload("bitrev", "\n".join(lines) + "\n", len(lines))
+
+
+def wide_spread(size: int, seed: int = 0) -> Workload:
+    """Accesses scattered over the whole 2^26-word address space.
+
+    Needs the paged VM; each instruction tends to land on a different page.
+    """
+    rng = random.Random(seed)
+    pointers = range(16, 80)
+    # CONST immediates are 23 bits wide, so pointers stay below 2^23.
+    lines = [f"CONST {rng.randrange(1024, 1 << 23)}, {p}" for p in pointers]
+    while len(lines) < size:
+        kind = rng.randrange(3)
+        addr = rng.randrange(1024, _WIDE_SPREAD)
+        if kind == 0:
+            lines.append(f"CONST {rng.getrandbits(23)}, {addr}")
+        elif kind == 1:
+            lines.append(f"LOAD {rng.choice(pointers)}, {addr}")
+        else:
+            b, d = rng.choice(pointers), rng.randrange(128)
+            lines.append(f"BITREV {b}, {d}, {addr}")
+    return Workload(
+        "wide",
+        "\n".join(lines) + "\n",
+        len(lines),
+        {"mem_size": _WIDE_SPREAD, "paged": True},
+    )
+
+
+GENERATORS = {
+    "mix": opcode_mix,
+    "bitrev": bitrev_vectors,
+    "wide": wide_spread,
+}
@@ -0,0 +1,325 @@
+"""Stdlib asyncio HTTP/1.1 front end for the UVM web UI and API.
+
+One coroutine per connection instead of one thread, persistent
+connections, and VM work pushed to a thread pool behind a semaphore so the
+event loop never runs assemble_and_run itself.
+"""
+
+import asyncio
+import json
+import mimetypes
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http import HTTPStatus
+from pathlib import Path
+from urllib.parse import unquote
+
+from dumpio import BINARY_MEDIA_TYPE, accepts_binary, iter_binary_dump
+from pool import BatchRunner, parse_batch_request
+from profiler import Profile
+from service import (
+    MAX_INSTRUCTIONS,
+    PROGRAM_CACHE,
+    RESULT_CACHE,
+    RUN_TIMEOUT,
+    RequestError,
+    iter_run_json,
+    parse_run_request,
+    run_stream,
+)
+
+MAX_INFLIGHT = 8
+MAX_HEADER_BYTES = 64 * 1024
+MAX_BODY_BYTES = 16 * 1024 * 1024
+KEEP_ALIVE_TIMEOUT = 75.0  # seconds a connection may sit idle
+JSON_TYPE = "application/json; charset=utf-8"
+
+
+class HTTPError(Exception):
+    def __init__(self, status: HTTPStatus, message: str | None = None):
+        super().__init__(message or status.phrase)
+        self.status = status
+
+
+class AsyncUVMServer:
+    def __init__(
+        self,
+        static_dir: Path,
+        max_inflight: int = MAX_INFLIGHT,
+        max_instructions: int | None = MAX_INSTRUCTIONS,
+        run_timeout: float | None = RUN_TIMEOUT,
+        batch_runner: BatchRunner | None = None,
+    ):
+        self.static_dir = Path(static_dir).resolve()
+        self.max_inflight = max_inflight
+        self.max_instructions = max_instructions
+        self.run_timeout = run_timeout
+        self.batch_runner = batch_runner
+        self._executor = ThreadPoolExecutor(max_workers=max_inflight)
+        self._inflight: asyncio.Semaphore | None = None
+
+    async def start(self, host: str, port: int) -> asyncio.Server:
+        self._inflight = asyncio.Semaphore(self.max_inflight)
+        return await asyncio.start_server(
+            self._handle_connection, host, port, limit=MAX_HEADER_BYTES
+        )
+
+    async def serve(self, host: str, port: int):
+        server = await self.start(host, port)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.close()
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+    # ------------------------------------------------------------------
+    # Connection handling
+    # ------------------------------------------------------------------
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(
+                        reader.readuntil(b"\r\n\r\n"), KEEP_ALIVE_TIMEOUT
+                    )
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError):
+                    break
+                except asyncio.LimitOverrunError:
+                    status = HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE
+                    await self._send(writer, status)
+                    break
+
+                try:
+                    request = await self._read_request(head, reader)
+                except HTTPError as exc:
+                    # The request's framing can't be trusted: drop the
+                    # connection rather than guess where the next one starts.
+                    await self._send_json(
+                        writer, {"error": str(exc)}, exc.status, keep_alive=False
+                    )
+                    break
+                method, path, version, headers, keep_alive, body = request
+                try:
+                    status, payload, content_type = await self._dispatch(
+                        method, path, headers, body
+                    )
+                except HTTPError as exc:
+                    status, content_type = exc.status, JSON_TYPE
+                    payload = _json_bytes({"error": str(exc)})
+
+                if not isinstance(payload, bytes) and version != "HTTP/1.1":
+                    payload = await self._run_in_executor(b"".join, payload)
+
+                head_only = method == "HEAD"
+                await self._send(
+                    writer, status, payload, content_type, keep_alive, head_only
+                )
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _read_request(self, head: bytes, reader):
+        try:
+            lines = head.decode("latin-1").split("\r\n")
+            method, path, version = lines[0].split(" ")
+            headers = {}
+            for line in lines[1:]:
+                if line:
+                    name, value = line.split(":", 1)
+                    headers[name.strip().lower()] = value.strip()
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Malformed request") from None
+
+        connection = headers.get("connection", "").lower()
+        if version == "HTTP/1.1":
+            keep_alive = connection != "close"
+        else:
+            keep_alive = connection == "keep-alive"
+
+        if "transfer-encoding" in headers:
+            raise HTTPError(HTTPStatus.LENGTH_REQUIRED, "Chunked bodies unsupported")
+        try:
+            length = int(headers.get("content-length", "0"))
+        except ValueError:
+            raise HTTPError(
+                HTTPStatus.BAD_REQUEST, "Invalid Content-Length header"
+            ) from None
+        if length < 0 or length > MAX_BODY_BYTES:
+            raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+
+        try:
+            body = await reader.readexactly(length) if length else b""
+        except asyncio.IncompleteReadError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Truncated request body") from None
+        path = path.split("?", 1)[0]
+        return method.upper(), path, version, headers, keep_alive, body
+
+    # ------------------------------------------------------------------
+    # Routing
+    # ------------------------------------------------------------------
+    async def _dispatch(self, method: str, path: str, headers: dict, body: bytes):
+        if method == "POST":
+            if path == "/api/run":
+                return await self._api_run(body, accepts_binary(headers.get("accept")))
+            if path == "/api/run-batch":
+                return await self._api_run_batch(body)
+            raise HTTPError(HTTPStatus.NOT_FOUND, "Unknown API endpoint")
+
+        if method in ("GET", "HEAD"):
+            if path == "/api/cache-stats":
+                stats = {
+                    "programs": PROGRAM_CACHE.stats(),
+                    "results": RESULT_CACHE.stats(),
+                }
+                return HTTPStatus.OK, _json_bytes(stats), JSON_TYPE
+            return await self._run_in_executor(self._static, path)
+
+        raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED)
+
+    async def _run_in_executor(self, func, *args):
+        async with self._inflight:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+
+    async def _api_run(self, body: bytes, binary: bool = False):
+        try:
+            payload = _parse_json(body)
+            asm_text, dump_start, dump_end = parse_run_request(payload)
+            profile = Profile() if payload.get("profile") else None
+            program_ir, count, chunks = await self._run_in_executor(
+                run_stream,
+                asm_text,
+                dump_start,
+                dump_end,
+                self.max_instructions,
+                self.run_timeout,
+                profile,
+            )
+        except Exception as exc:
+            return _json_error(exc)
+        if binary:
+            pieces = iter_binary_dump(chunks, dump_start, count)
+            return HTTPStatus.OK, pieces, BINARY_MEDIA_TYPE
+        pieces = iter_run_json(program_ir, dump_start, dump_end, chunks, profile)
+        return HTTPStatus.OK, pieces, JSON_TYPE
+
+    async def _api_run_batch(self, body: bytes):
+        try:
+            jobs = parse_batch_request(_parse_json(body))
+        except RequestError as exc:
+            return _json_error(exc)
+
+        if self.batch_runner is None:
+            self.batch_runner = BatchRunner()
+        try:
+            results = await self._run_in_executor(
+                self.batch_runner.run, jobs, self.max_instructions, self.run_timeout
+            )
+        except BrokenProcessPool as exc:
+            return _json_error(exc, HTTPStatus.SERVICE_UNAVAILABLE)
+        except Exception as exc:
+            return _json_error(exc, HTTPStatus.INTERNAL_SERVER_ERROR)
+        payload = _json_bytes({"results": results})
+        return HTTPStatus.OK, payload, JSON_TYPE
+
+    def _static(self, path: str):
+        """Read a static file; runs in the executor, off the event loop."""
+        rel = unquote(path).lstrip("/") or "index.html"
+        try:
+            target = (self.static_dir / rel).resolve()
+            if target.is_dir():
+                target = target / "index.html"
+            if self.static_dir not in target.parents or not target.is_file():
+                raise HTTPError(HTTPStatus.NOT_FOUND, "File not found")
+            body = target.read_bytes()
+        except (ValueError, OSError):  # e.g. an embedded NUL or unreadable file
+            raise HTTPError(HTTPStatus.NOT_FOUND, "File not found") from None
+
+        content_type, _ = mimetypes.guess_type(target.name)
+        return HTTPStatus.OK, body, content_type or "application/octet-stream"
+
+    # ------------------------------------------------------------------
+    # Responses
+    # ------------------------------------------------------------------
+    async def _send(
+        self,
+        writer,
+        status: HTTPStatus,
+        body=b"",
+        content_type: str = "text/plain; charset=utf-8",
+        keep_alive: bool = False,
+        head_only: bool = False,
+    ):
+        """Send a response; a non-bytes body is an iterator of chunks.
+
+        Chunks are produced in the executor so encoding a large dump never
+        runs on the event loop.
+        """
+        chunked = not isinstance(body, bytes)
+        if chunked:
+            length = "Transfer-Encoding: chunked"
+        else:
+            length = f"Content-Length: {len(body)}"
+        header = (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"{length}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+            "\r\n"
+        )
+        writer.write(header.encode("latin-1"))
+        if head_only:
+            await writer.drain()
+            return
+        if not chunked:
+            writer.write(body)
+            await writer.drain()
+            return
+
+        loop = asyncio.get_running_loop()
+        while True:
+            piece = await loop.run_in_executor(self._executor, next, body, None)
+            if piece is None:
+                break
+            writer.write(b"%X\r\n%s\r\n" % (len(piece), piece))
+            await writer.drain()
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    async def _send_json(self, writer, payload, status: HTTPStatus, keep_alive: bool):
+        await self._send(
+            writer,
+            status,
+            _json_bytes(payload),
+            JSON_TYPE,
+            keep_alive,
+        )
+
+
+def _parse_json(body: bytes):
+    try:
+        return json.loads(body or b"{}")
+    except json.JSONDecodeError:
+        raise RequestError("Invalid JSON payload") from None
+
+
+def _json_bytes(payload) -> bytes:
+    return json.dumps(payload).encode("utf-8")
+
+
+def _json_error(exc: Exception, status: HTTPStatus = HTTPStatus.BAD_REQUEST):
+    return (
+        status,
+        _json_bytes({"error": str(exc)}),
+        JSON_TYPE,
+    )
@@ -1,6 +1,37 @@
 import argparse
-from assembler_ir import parse_program
-from encode import encode_program
+from typing import Iterable, Tuple
+
+from assembler_ir import iter_parse, parse_into, parse_program
+from atomic_file import atomic_write
+from build_cache import DEFAULT_MAX_BYTES, BuildCache, binary_key, source_key
+from encode import encode_program, write_program
+from model import Instr
+from optimizer import OptimizeStats, optimize
+from parallel_asm import assemble_parallel
+from predecode import predecode
+from vm import MEM_SIZE
+
+
+def _write_atomically(program: Iterable[Instr], path: str) -> int:
+    # Output goes to a temporary file first, so a syntax error halfway
+    # through never leaves a truncated binary behind. The name is unique,
+    # so concurrent builds of the same output cannot clobber each other.
+    return atomic_write(path, lambda fout: write_program(program, fout))
+
+
+def assemble_file(src: str, outbin: str) -> int:
+    """Stream src through the parser and encoder into outbin."""
+    with open(src, "r", encoding="utf-8") as fin:
+        return _write_atomically(iter_parse(fin), outbin)
+
+
+def assemble_optimized(
+    src: str, outbin: str, mem_size: int = MEM_SIZE
+) -> Tuple[int, OptimizeStats]:
+    """Assemble src with the IR optimizer; the whole program is held in memory."""
+    with open(src, "r", encoding="utf-8") as fin:
+        program, stats = optimize(parse_into(fin), mem_size)
+    return _write_atomically(program, outbin), stats
 
 
 def main():
@@ -8,17 +39,73 @@ def main():
     parser.add_argument("src", help="Assembly source file")
     parser.add_argument("outbin", help="Output binary file")
     parser.add_argument("--test", action="store_true", help="Print instruction dump")
+    parser.add_argument(
+        "--jobs", type=int, default=1, help="Assemble with N worker processes"
+    )
+    parser.add_argument(
+        "-O",
+        "--optimize",
+        action="store_true",
+        help="Fold constants and drop dead stores (ignores --jobs)",
+    )
+    parser.add_argument(
+        "--mem-size",
+        type=int,
+        default=MEM_SIZE,
+        help=f"VM memory size assumed by -O (default {MEM_SIZE})",
+    )
+    parser.add_argument(
+        "--cache-dir", help="Reuse binaries of unchanged sources from this directory"
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=DEFAULT_MAX_BYTES // (1024 * 1024),
+        help="Cache size limit in MiB; least recently used entries go first",
+    )
+    parser.add_argument(
+        "--cache-predecoded",
+        action="store_true",
+        help="Also cache the pre-decoded program for interpreter.py --cache-dir",
+    )
     args = parser.parse_args()
 
+    if not args.test:
+        cache = None
+        if args.cache_dir:
+            cache = BuildCache(args.cache_dir, args.cache_size * 1024 * 1024)
+            options = f"-O {args.mem_size}" if args.optimize else ""
+            key = source_key(args.src, options)
+            count = cache.fetch(key, args.outbin)
+            if count is not None:
+                print(f"Cache hit: {count} instructions copied into {args.outbin}")
+                return
+
+        if args.optimize:
+            count, stats = assemble_optimized(args.src, args.outbin, args.mem_size)
+            print(f"Optimizer: {stats}")
+        elif args.jobs > 1:
+            count = assemble_parallel(args.src, args.outbin, args.jobs)
+        else:
+            count = assemble_file(args.src, args.outbin)
+        print(f"Compiled {count} instructions into {args.outbin}")
+
+        if cache is not None:
+            cache.store(key, args.outbin)
+            if args.cache_predecoded:
+                with open(args.outbin, "rb") as f:
+                    code = f.read()
+                cache.store_predecoded(binary_key(code), predecode(code))
+        return
+
     with open(args.src, "r", encoding="utf-8") as f:
         text = f.read()
 
     program = parse_program(text)
 
-    if args.test:
-        print("----- IR DUMP -----")
-        for i, instr in enumerate(program):
-            print(f"{i}: {instr}")
+    print("----- IR DUMP -----")
+    for i, instr in enumerate(program):
+        print(f"{i}: {instr}")
 
     binary = encode_program(program)
 
@@ -27,13 +114,12 @@ def main():
 
     print(f"Compiled {len(program)} instructions into {args.outbin}")
 
-    if args.test:
-        print("\n----- BYTE DUMP -----")
-        for i, b in enumerate(binary):
-            if i % 11 == 0:
-                print(f"\nInstr {i // 11}: ", end="")
-            print(f"0x{b:02X} ", end="")
-        print()
+    print("\n----- BYTE DUMP -----")
+    for i, b in enumerate(binary):
+        if i % 11 == 0:
+            print(f"\nInstr {i // 11}: ", end="")
+        print(f"0x{b:02X} ", end="")
+    print()
 
 
 if __name__ == "__main__":
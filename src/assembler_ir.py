@@ -1,16 +1,42 @@
 import re
-from typing import List
-from model import Op, Instr
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+from model import OPS_BY_CODE, Instr, Program
 
+_LINE_RE = re.compile(r"([A-Za-z]+)\s*(.*)")
 
-def parse_line(line: str) -> Instr | None:
+Fields = Tuple[int, int, int, int]  # A, B, C, D
+
+
+class AsmSyntaxError(ValueError):
+    """Parse error tagged with the 1-based source line it comes from."""
+
+    def __init__(self, lineno: int, message: str):
+        super().__init__(f"line {lineno}: {message}")
+        self.lineno = lineno
+        self.message = message
+
+    def __reduce__(self):
+        return type(self), (self.lineno, self.message)
+
+
+# mnemonic -> (opcode, argument count, builder giving the B, C, D fields)
+_HANDLERS: Dict[str, Tuple[int, int, Callable[..., Tuple[int, int, int]]]] = {
+    "CONST": (4, 2, lambda value, addr: (value, addr, 0)),
+    "LOAD": (12, 2, lambda addrB, addrC: (addrB, addrC, 0)),
+    "STORE": (3, 2, lambda addrB, addrC: (addrB, addrC, 0)),
+    "BITREV": (9, 3, lambda addrB, offset, addrC: (addrB, addrC, offset)),
+}
+
+
+def parse_fields(line: str) -> Fields | None:
+    """Parse one line into its (A, B, C, D) fields without building an Instr."""
     # Remove comments
     line = line.split(";", 1)[0].strip()
 
     if not line:
         return None
 
-    match = re.match(r"([A-Za-z]+)\s*(.*)", line)
+    match = _LINE_RE.match(line)
     if not match:
         raise ValueError(f"Invalid line: {line}")
 
@@ -20,37 +46,53 @@ def parse_line(line: str) -> Instr | None:
     args = [a.strip() for a in args_raw.split(",") if a.strip()]
     nums = [int(a) for a in args]
 
-    if mnemonic == "CONST":
-        if len(nums) != 2:
-            raise ValueError("CONST requires 2 arguments")
-        value, addr = nums
-        return Instr(Op.CONST, 4, value, addr)
-
-    if mnemonic == "LOAD":
-        if len(nums) != 2:
-            raise ValueError("LOAD requires 2 arguments")
-        addrB, addrC = nums
-        return Instr(Op.LOAD, 12, addrB, addrC)
-
-    if mnemonic == "STORE":
-        if len(nums) != 2:
-            raise ValueError("STORE requires 2 arguments")
-        addrB, addrC = nums
-        return Instr(Op.STORE, 3, addrB, addrC)
-
-    if mnemonic == "BITREV":
-        if len(nums) != 3:
-            raise ValueError("BITREV requires 3 arguments")
-        addrB, offset, addrC = nums
-        return Instr(Op.BITREV, 9, addrB, addrC, offset)
-
-    raise ValueError(f"Unknown instruction {mnemonic}")
-
-
-def parse_program(text: str) -> List[Instr]:
-    program = []
-    for line in text.splitlines():
-        instr = parse_line(line)
-        if instr:
-            program.append(instr)
+    handler = _HANDLERS.get(mnemonic)
+    if handler is None:
+        raise ValueError(f"Unknown instruction {mnemonic}")
+
+    opcode, arity, build = handler
+    if len(nums) != arity:
+        raise ValueError(f"{mnemonic} requires {arity} arguments")
+    return (opcode, *build(*nums))
+
+
+def parse_line(line: str) -> Instr | None:
+    fields = parse_fields(line)
+    if fields is None:
+        return None
+    return Instr(OPS_BY_CODE[fields[0]], *fields)
+
+
+def iter_parse_fields(lines: Iterable[str], first_lineno: int = 1) -> Iterator[Fields]:
+    for lineno, line in enumerate(lines, first_lineno):
+        try:
+            fields = parse_fields(line)
+        except ValueError as exc:
+            raise AsmSyntaxError(lineno, str(exc)) from None
+        if fields:
+            yield fields
+
+
+def iter_parse(lines: Iterable[str], first_lineno: int = 1) -> Iterator[Instr]:
+    """Parse lines lazily; accepts any iterable of lines, e.g. an open file."""
+    for fields in iter_parse_fields(lines, first_lineno):
+        yield Instr(OPS_BY_CODE[fields[0]], *fields)
+
+
+def parse_into(
+    lines: Iterable[str], program: Program | None = None, first_lineno: int = 1
+) -> Program:
+    """Append the parsed lines to a compact Program (a new one by default)."""
+    if program is None:
+        program = Program()
+    append = program.append
+    for fields in iter_parse_fields(lines, first_lineno):
+        append(*fields)
     return program
+
+
+def parse_program(text: str, compact: bool = False) -> List[Instr] | Program:
+    """Parse a whole source; compact=True returns a Program instead of Instrs."""
+    if compact:
+        return parse_into(text.splitlines())
+    return list(iter_parse(text.splitlines()))
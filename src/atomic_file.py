@@ -0,0 +1,46 @@
+"""Replace an output file atomically: write a temporary file, then os.replace."""
+
+import os
+import secrets
+import tempfile
+from typing import BinaryIO, Callable, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+def mkstemp_beside(path: str, suffix: str = "") -> Tuple[int, str]:
+    """Create a uniquely named file next to path; returns (fd, name).
+
+    Unlike tempfile.mkstemp the file gets the mode a plain open() would
+    give it (0666 less the umask), so it can replace an output as is.
+    """
+    directory = os.path.dirname(path) or "."
+    prefix = os.path.basename(path) + "."
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+    for _ in range(tempfile.TMP_MAX):
+        name = os.path.join(directory, prefix + secrets.token_hex(4) + suffix)
+        try:
+            return os.open(name, flags, 0o666), name
+        except FileExistsError:
+            continue
+    raise FileExistsError(f"No unused temporary name for {path}")
+
+
+def atomic_write(path: str, write: Callable[[BinaryIO], T], suffix: str = "") -> T:
+    """Call write(f) on a temporary file beside path and move it over path.
+
+    Returns what write returned. If anything fails the temporary file is
+    removed and path is left as it was.
+    """
+    fd, tmp_path = mkstemp_beside(path, suffix)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            result = write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+    return result
@@ -0,0 +1,140 @@
+"""Run one program over many memory images at once.
+
+BatchVM holds N memory images ("lanes") as an N x mem_size uint64 NumPy
+array and executes every instruction on all lanes together: pointer reads
+become per-lane gathers and indirect writes per-lane scatters, so lanes may
+follow different addresses. Without NumPy each lane is an ordinary VM run
+through the pre-decoded loop.
+
+A fault in any lane (an address outside memory) raises IndexError for the
+whole batch, naming the lane and instruction.
+"""
+
+from typing import Iterable, List, Sequence
+
+from predecode import (
+    OP_BITREV,
+    OP_CONST,
+    OP_LOAD,
+    PredecodedProgram,
+    predecode,
+    run_predecoded,
+)
+from vm import ADDRESS_SPACE, MEM_SIZE, VM
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+HAVE_NUMPY = np is not None
+
+if HAVE_NUMPY:
+    _REV8_TABLE = np.array(
+        [int(f"{i:08b}"[::-1], 2) for i in range(256)], dtype=np.uint8
+    )
+
+
+def bitreverse64_lanes(words):
+    """Bit-reverse every element of a uint64 NumPy array."""
+    out = words.byteswap()
+    as_bytes = out.view(np.uint8)
+    as_bytes[...] = _REV8_TABLE[as_bytes]
+    return out
+
+
+class BatchVM:
+    def __init__(
+        self, lanes: int, mem_size: int = MEM_SIZE, use_numpy: bool | None = None
+    ):
+        if lanes <= 0:
+            raise ValueError("A batch needs at least one lane")
+        if not 0 < mem_size <= ADDRESS_SPACE:
+            raise ValueError(f"Memory size must be in 1..{ADDRESS_SPACE}")
+        if use_numpy is None:
+            use_numpy = HAVE_NUMPY
+        if use_numpy and not HAVE_NUMPY:
+            raise RuntimeError("NumPy is not installed")
+
+        self.lanes = lanes
+        self.mem_size = mem_size
+        self.use_numpy = use_numpy
+        if use_numpy:
+            self.mem = np.zeros((lanes, mem_size), dtype=np.uint64)
+            self._rows = np.arange(lanes)
+        else:
+            self.vms = [VM(mem_size) for _ in range(lanes)]
+
+    def load_image(self, lane: int, words: Sequence[int], start: int = 0):
+        """Copy words into one lane's memory at start."""
+        if self.use_numpy:
+            self.mem[lane, start : start + len(words)] = words
+        else:
+            mem = self.vms[lane].mem
+            for offset, word in enumerate(words):
+                mem[start + offset] = word
+
+    def dump(self, lane: int, start: int, end: int) -> List[int]:
+        if self.use_numpy:
+            return [int(w) for w in self.mem[lane, start:end]]
+        return self.vms[lane].dump(start, end)
+
+    def run(self, program: PredecodedProgram):
+        """Execute a pre-decoded program on every lane."""
+        if not self.use_numpy:
+            for lane, vm in enumerate(self.vms):
+                try:
+                    run_predecoded(program, vm)
+                except IndexError:
+                    raise IndexError(
+                        f"memory address out of range in lane {lane}"
+                    ) from None
+            return
+
+        mem, rows = self.mem, self._rows
+        columns = zip(
+            program.ops.tolist(),
+            program.b.tolist(),
+            program.c.tolist(),
+            program.d.tolist(),
+        )
+        for ip, (a, b, c, d) in enumerate(columns):
+            if a == OP_CONST:
+                mem[:, c] = b
+            elif a == OP_LOAD:
+                mem[:, c] = mem[rows, self._addresses(mem[:, b], 0, ip)]
+            elif a == OP_BITREV:
+                src = self._addresses(mem[:, b], d, ip)
+                mem[:, c] = bitreverse64_lanes(mem[rows, src])
+            else:
+                value = mem[rows, self._addresses(mem[:, b], 0, ip)]
+                handle = self._addresses(mem[:, c], 0, ip)
+                dst = self._addresses(mem[rows, handle], 0, ip)
+                mem[rows, dst] = value
+
+    def _addresses(self, pointers, offset: int, ip: int):
+        # Check before adding the offset so uint64 wrap-around cannot hide
+        # an out-of-range pointer.
+        limit = self.mem_size - offset
+        bad = pointers >= limit if limit > 0 else np.ones(self.lanes, dtype=bool)
+        if bad.any():
+            lane = int(bad.argmax())
+            raise IndexError(
+                f"memory address out of range in lane {lane} at instruction {ip}"
+            )
+        return (pointers + np.uint64(offset)).astype(np.intp)
+
+
+def run_batch(
+    code,
+    images: Iterable[Sequence[int]],
+    mem_size: int = MEM_SIZE,
+    use_numpy: bool | None = None,
+) -> BatchVM:
+    """Run a binary once per initial memory image and return the batch."""
+    images = list(images)
+    batch = BatchVM(len(images), mem_size, use_numpy)
+    for lane, words in enumerate(images):
+        batch.load_image(lane, words)
+    batch.run(predecode(code))
+    return batch
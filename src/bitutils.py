@@ -1,6 +1,53 @@
-def bitreverse64(x: int) -> int:
+from array import array
+from typing import Iterable
+
+
+def _bitreverse_slow(x: int, width: int) -> int:
     result = 0
-    for i in range(64):
+    for i in range(width):
         if (x >> i) & 1:
-            result |= 1 << (63 - i)
+            result |= 1 << (width - 1 - i)
     return result
+
+
+# 16-bit reverse table, built once at import.
+_REV8 = [_bitreverse_slow(i, 8) for i in range(256)]
+_REV16 = [(_REV8[i & 0xFF] << 8) | _REV8[i >> 8] for i in range(1 << 16)]
+
+
+def bitreverse64(x: int) -> int:
+    t = _REV16
+    return (
+        (t[x & 0xFFFF] << 48)
+        | (t[(x >> 16) & 0xFFFF] << 32)
+        | (t[(x >> 32) & 0xFFFF] << 16)
+        | t[(x >> 48) & 0xFFFF]
+    )
+
+
+def bitreverse64_many(words: Iterable[int]) -> array:
+    """Bit-reverse a sequence of 64-bit words in one call.
+
+    Accepts any iterable of ints or a bytes-like buffer of native-endian
+    u64 words; returns an array('Q').
+    """
+    if isinstance(words, (bytes, bytearray, memoryview)):
+        # Release the cast views before returning, so a mapped or
+        # resizable buffer is not left with exports.
+        with memoryview(words) as view, view.cast("B") as raw, raw.cast("Q") as q:
+            return _reverse_words(q)
+    return _reverse_words(words)
+
+
+def _reverse_words(words: Iterable[int]) -> array:
+    t = _REV16
+    return array(
+        "Q",
+        [
+            (t[x & 0xFFFF] << 48)
+            | (t[(x >> 16) & 0xFFFF] << 32)
+            | (t[(x >> 32) & 0xFFFF] << 16)
+            | t[(x >> 48) & 0xFFFF]
+            for x in words
+        ],
+    )
@@ -0,0 +1,174 @@
+"""On-disk cache of assembled binaries, keyed by source content.
+
+An entry's key is the sha256 of the assembler version, the build options
+and the source bytes, so a rebuild of an unchanged file copies the cached
+binary instead of parsing and encoding it again. Binaries live in
+<root>/<first two hex digits>/<key>.bin. Pre-decoded programs are stored
+as <sha256 of the binary>.pre, so the interpreter can find them from the
+binary alone and skip decoding.
+
+Every file is written to a temporary name in the same directory and moved
+into place with os.replace, so concurrent builds only ever see complete
+entries. A hit refreshes the entry's mtime; when the cache grows past
+max_bytes the entries with the oldest mtime are removed first. Temporary
+files count against the limit too, and ones left behind by a crashed
+build are removed once they are STALE_TMP_AGE seconds old.
+"""
+
+import hashlib
+import os
+import shutil
+import struct
+import sys
+import time
+from array import array
+from typing import Iterator, List, Tuple
+
+from atomic_file import atomic_write
+from model import Program
+
+# Bump whenever parsing or encoding changes the bytes produced for a source.
+ASSEMBLER_VERSION = 1
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+STALE_TMP_AGE = 3600.0  # seconds before an unfinished write counts as abandoned
+
+_PREDECODED_MAGIC = b"UVMP"
+_PREDECODED_VERSION = 1
+_PREDECODED_HEADER = struct.Struct("<4sHQ")  # magic, version, instructions
+_READ_CHUNK = 1 << 20
+
+
+def source_key(src: str, options: str = "") -> str:
+    """Cache key of a source file built with the given option string."""
+    digest = hashlib.sha256(f"uvm-asm {ASSEMBLER_VERSION} {options}\n".encode())
+    with open(src, "rb") as f:
+        while chunk := f.read(_READ_CHUNK):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def binary_key(code) -> str:
+    """Cache key of a pre-decoded program: the sha256 of its binary."""
+    return hashlib.sha256(code).hexdigest()
+
+
+def _write_predecoded(program: Program, f):
+    header = _PREDECODED_HEADER.pack(
+        _PREDECODED_MAGIC, _PREDECODED_VERSION, len(program)
+    )
+    f.write(header)
+    for column in (program.ops, program.b, program.c, program.d):
+        if sys.byteorder != "little" and column.itemsize > 1:
+            column = array(column.typecode, column)
+            column.byteswap()
+        f.write(column.tobytes())
+
+
+def _read_predecoded(data: bytes) -> Program:
+    if len(data) < _PREDECODED_HEADER.size:
+        raise ValueError("Truncated pre-decoded program")
+    magic, version, count = _PREDECODED_HEADER.unpack_from(data)
+    if magic != _PREDECODED_MAGIC or version != _PREDECODED_VERSION:
+        raise ValueError("Not a pre-decoded UVM program")
+
+    program = Program()
+    pos = _PREDECODED_HEADER.size
+    for column in (program.ops, program.b, program.c, program.d):
+        end = pos + count * column.itemsize
+        if end > len(data):
+            raise ValueError("Truncated pre-decoded program")
+        column.frombytes(data[pos:end])
+        if sys.byteorder != "little" and column.itemsize > 1:
+            column.byteswap()
+        pos = end
+    return program
+
+
+class BuildCache:
+    def __init__(self, root: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, key: str, suffix: str = ".bin") -> str:
+        return os.path.join(self.root, key[:2], key + suffix)
+
+    def _atomic_write(self, path: str, write):
+        # The .tmp suffix lets entries() tell unfinished writes apart.
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        atomic_write(path, write, ".tmp")
+
+    def fetch(self, key: str, outbin: str) -> int | None:
+        """Copy a cached binary to outbin; returns its instruction count or
+        None on a miss."""
+        path = self.path(key)
+        try:
+            os.utime(path)
+            cached = open(path, "rb")
+        except FileNotFoundError:  # never built, or evicted meanwhile
+            return None
+        with cached:
+            atomic_write(outbin, lambda out: shutil.copyfileobj(cached, out))
+        return os.path.getsize(outbin) // 11
+
+    def store(self, key: str, binary_path: str):
+        """Add a freshly built binary to the cache."""
+        with open(binary_path, "rb") as src:
+            self._atomic_write(self.path(key), lambda f: shutil.copyfileobj(src, f))
+        self.evict()
+
+    def store_predecoded(self, key: str, program: Program):
+        """Cache a pre-decoded program under binary_key of its binary."""
+        self._atomic_write(
+            self.path(key, ".pre"), lambda f: _write_predecoded(program, f)
+        )
+        self.evict()
+
+    def load_predecoded(self, key: str) -> Program | None:
+        path = self.path(key, ".pre")
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return _read_predecoded(data)
+
+    def entries(self) -> Iterator[Tuple[float, int, List[str]]]:
+        """Yield (last use, total bytes, files) for every cached key, and for
+        every temporary file on its own."""
+        groups: dict = {}
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                path = os.path.join(directory, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                key = name if name.endswith(".tmp") else os.path.splitext(name)[0]
+                mtime, size, files = groups.get(key, (0.0, 0, []))
+                groups[key] = (max(mtime, st.st_mtime), size + st.st_size, files)
+                files.append(path)
+        return iter(groups.values())
+
+    def evict(self) -> int:
+        """Remove least recently used entries until the cache fits max_bytes;
+        returns the number of entries removed."""
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        now = time.time()
+        for mtime, size, files in entries:
+            if files[0].endswith(".tmp"):
+                if now - mtime < STALE_TMP_AGE:
+                    continue  # another build may still be writing it
+            elif total <= self.max_bytes:
+                continue
+            for path in files:
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+            total -= size
+            removed += 1
+        return removed
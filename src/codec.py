@@ -0,0 +1,152 @@
+"""Bulk codec between whole programs and the 11-byte wire format.
+
+Programs are handled as struct-of-arrays columns (opcode nibble A, B, C, D).
+NumPy is used when installed; otherwise a pure-stdlib path based on struct
+is used. Both produce identical results to encode_instr/decode_instr.
+"""
+
+import struct
+from array import array
+from typing import Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+HAVE_NUMPY = np is not None
+
+INSTR_SIZE = 11
+OPCODES = (4, 12, 3, 9)
+
+_MASK23 = (1 << 23) - 1
+_MASK26 = (1 << 26) - 1
+_MASK7 = (1 << 7) - 1
+
+# Every field lives in the low 63 bits, so the top three bytes are padding.
+_WORD = struct.Struct("<Q3x")
+
+Columns = Tuple[array, array, array, array]
+
+
+def _use_numpy(use_numpy: bool | None) -> bool:
+    if use_numpy is None:
+        return HAVE_NUMPY
+    if use_numpy and not HAVE_NUMPY:
+        raise RuntimeError("NumPy is not installed")
+    return use_numpy
+
+
+def encode_columns(
+    ops: Sequence[int],
+    b: Sequence[int],
+    c: Sequence[int],
+    d: Sequence[int],
+    use_numpy: bool | None = None,
+) -> bytes:
+    if not len(ops) == len(b) == len(c) == len(d):
+        raise ValueError("Program columns must have the same length")
+    if _use_numpy(use_numpy):
+        return _encode_numpy(ops, b, c, d)
+    return _encode_stdlib(ops, b, c, d)
+
+
+def decode_columns(data, use_numpy: bool | None = None) -> Columns:
+    """Decode every whole instruction in data; a trailing partial one is ignored."""
+    # Every derived view is released on the way out, even on error, so a
+    # memory-mapped binary can still be closed while the exception unwinds.
+    with memoryview(data) as view, view.cast("B") as raw:
+        with raw[: len(raw) - len(raw) % INSTR_SIZE] as body:
+            if _use_numpy(use_numpy):
+                return _decode_numpy(body)
+            return _decode_stdlib(body)
+
+
+def _encode_stdlib(ops, b, c, d) -> bytes:
+    words = []
+    append = words.append
+    for a, bv, cv, dv in zip(ops, b, c, d):
+        if a == 4:
+            append(a | (bv & _MASK23) << 4 | (cv & _MASK26) << 27)
+        elif a == 12 or a == 3:
+            append(a | (bv & _MASK26) << 4 | (cv & _MASK26) << 30)
+        elif a == 9:
+            append(
+                a | (bv & _MASK26) << 4 | (cv & _MASK26) << 30 | (dv & _MASK7) << 56
+            )
+        else:
+            raise ValueError("Invalid opcode")
+    return b"".join(map(_WORD.pack, words))
+
+
+def _decode_stdlib(view: memoryview) -> Columns:
+    ops, bs, cs, ds = array("B"), array("I"), array("I"), array("B")
+
+    for (v,) in _WORD.iter_unpack(view):
+        a = v & 0xF
+        if a == 4:
+            ops.append(a)
+            bs.append((v >> 4) & _MASK23)
+            cs.append((v >> 27) & _MASK26)
+            ds.append(0)
+        elif a == 12 or a == 3 or a == 9:
+            ops.append(a)
+            bs.append((v >> 4) & _MASK26)
+            cs.append((v >> 30) & _MASK26)
+            ds.append((v >> 56) & _MASK7 if a == 9 else 0)
+        else:
+            raise ValueError(f"Unknown opcode A={a}")
+
+    return ops, bs, cs, ds
+
+
+def _operands(values, mask: int):
+    """Operand column as uint64; plain ints (possibly negative or wider than
+    64 bits) are masked in Python first, as the stdlib encoder does."""
+    if isinstance(values, array):
+        return np.asarray(values, dtype=np.uint64)
+    return np.fromiter((v & mask for v in values), np.uint64, len(values))
+
+
+def _encode_numpy(ops, b, c, d) -> bytes:
+    u64 = np.uint64
+    a = np.asarray(ops, dtype=u64)
+    bv = _operands(b, _MASK26)
+    cv = _operands(c, _MASK26)
+    dv = _operands(d, _MASK7)
+
+    if not np.isin(a, OPCODES).all():
+        raise ValueError("Invalid opcode")
+
+    const_word = a | ((bv & u64(_MASK23)) << u64(4)) | ((cv & u64(_MASK26)) << u64(27))
+    bc_word = a | ((bv & u64(_MASK26)) << u64(4)) | ((cv & u64(_MASK26)) << u64(30))
+    bc_word |= np.where(a == 9, (dv & u64(_MASK7)) << u64(56), u64(0))
+    words = np.where(a == 4, const_word, bc_word).astype("<u8")
+
+    out = np.zeros((len(words), INSTR_SIZE), dtype=np.uint8)
+    out[:, :8] = words.view(np.uint8).reshape(-1, 8)
+    return out.tobytes()
+
+
+def _decode_numpy(view: memoryview) -> Columns:
+    u64 = np.uint64
+    raw = np.frombuffer(view, dtype=np.uint8).reshape(-1, INSTR_SIZE)
+    lo = np.ascontiguousarray(raw[:, :8]).view("<u8").reshape(-1).astype(u64)
+    del raw  # drop the export on view before anything can raise
+
+    a = lo & u64(0xF)
+    bad = ~np.isin(a, OPCODES)
+    if bad.any():
+        raise ValueError(f"Unknown opcode A={int(a[bad][0])}")
+
+    const = a == 4
+    b = np.where(const, (lo >> u64(4)) & u64(_MASK23), (lo >> u64(4)) & u64(_MASK26))
+    c = np.where(const, (lo >> u64(27)) & u64(_MASK26), (lo >> u64(30)) & u64(_MASK26))
+    d = np.where(a == 9, (lo >> u64(56)) & u64(_MASK7), u64(0))
+
+    return (
+        array("B", a.astype(np.uint8).tobytes()),
+        array("I", b.astype(np.uint32).tobytes()),
+        array("I", c.astype(np.uint32).tobytes()),
+        array("B", d.astype(np.uint8).tobytes()),
+    )
@@ -0,0 +1,94 @@
+"""Compile straight-line UVM programs to native Python functions.
+
+The program is split into blocks of BLOCK_SIZE instructions, each turned
+into one generated function that works directly on the memory buffer.
+Compiled programs are cached by a hash of their binary encoding.
+"""
+
+import hashlib
+from dataclasses import dataclass
+from typing import Callable, List
+
+from bitutils import bitreverse64
+from codec import decode_columns
+from encode import encode_program
+from lru import LRUCache
+from model import Instr, Program
+from predecode import PredecodedProgram
+
+BLOCK_SIZE = 4096
+CACHE_SIZE = 64
+
+_cache = LRUCache(CACHE_SIZE)
+
+
+@dataclass
+class CompiledProgram:
+    blocks: List[Callable]
+    length: int
+    block_size: int = BLOCK_SIZE
+    # Kept for running partial blocks, e.g. when resuming mid-block.
+    columns: PredecodedProgram | None = None
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __call__(self, mem):
+        for block in self.blocks:
+            block(mem)
+
+
+def _statement(a: int, b: int, c: int, d: int) -> str:
+    if a == 4:
+        return f"m[{c}] = {b}"
+    if a == 12:
+        return f"m[{c}] = m[m[{b}]]"
+    if a == 3:
+        return f"m[m[m[{c}]]] = m[m[{b}]]"
+    if a == 9:
+        return f"m[{c}] = rev(m[m[{b}] + {d}])"
+    raise ValueError(f"Unknown opcode A={a}")
+
+
+def generate_source(ops, b, c, d, block_size: int = BLOCK_SIZE) -> str:
+    lines = []
+    for start in range(0, len(ops), block_size):
+        lines.append(f"def _block_{start // block_size}(m):")
+        lines.append("    rev = _rev")
+        for i in range(start, min(start + block_size, len(ops))):
+            lines.append("    " + _statement(ops[i], b[i], c[i], d[i]))
+    return "\n".join(lines) + "\n"
+
+
+def _compile(code, block_size: int) -> CompiledProgram:
+    ops, b, c, d = decode_columns(code)
+    source = generate_source(ops, b, c, d, block_size)
+    namespace = {"_rev": bitreverse64}
+    exec(compile(source, "<uvm-program>", "exec"), namespace)
+
+    n_blocks = -(-len(ops) // block_size)
+    blocks = [namespace[f"_block_{i}"] for i in range(n_blocks)]
+    columns = PredecodedProgram(ops, b, c, d)
+    return CompiledProgram(blocks, len(ops), block_size, columns)
+
+
+def compile_binary(code, block_size: int = BLOCK_SIZE) -> CompiledProgram:
+    if isinstance(code, Program):
+        code = encode_program(code)
+    key = hashlib.sha256(code).digest() + block_size.to_bytes(4, "little")
+
+    compiled = _cache.get(key)
+    if compiled is None:
+        compiled = _compile(code, block_size)
+        _cache.put(key, compiled)
+    return compiled
+
+
+def compile_program(
+    program: List[Instr] | Program, block_size: int = BLOCK_SIZE
+) -> CompiledProgram:
+    return compile_binary(encode_program(program), block_size)
+
+
+def clear_cache():
+    _cache.clear()
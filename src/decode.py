@@ -1,11 +1,9 @@
-from model import Op, Instr
+from codec import decode_columns
+from model import OPS_BY_CODE, Instr, Op
 
 
 def read_u63_from_11(data: bytes) -> int:
-    val = 0
-    for i in range(11):
-        val |= data[i] << (8 * i)
-    return val
+    return int.from_bytes(data[:11], "little")
 
 
 def decode_instr(data: bytes) -> Instr:
@@ -33,3 +31,10 @@ def decode_instr(data: bytes) -> Instr:
             return Instr(Op.BITREV, A, B, C, D)
 
     raise ValueError(f"Unknown opcode A={A}")
+
+
+def decode_program(data) -> list[Instr]:
+    ops, b, c, d = decode_columns(data)
+    return [
+        Instr(OPS_BY_CODE[a], a, bv, cv, dv) for a, bv, cv, dv in zip(ops, b, c, d)
+    ]
@@ -0,0 +1,154 @@
+import json
+import mmap
+import struct
+import sys
+from array import array
+from dataclasses import dataclass
+from typing import BinaryIO, Iterable, Iterator, List, Sequence, TextIO
+
+DUMP_FORMATS = ("json", "ndjson", "bin")
+
+# Binary dump: 24-byte header followed by `count` little-endian u64 words.
+BINARY_MAGIC = b"UVMD"
+BINARY_VERSION = 1
+BINARY_MEDIA_TYPE = "application/vnd.uvm.dump"
+_HEADER = struct.Struct("<4sH2xQQ")  # magic, version, start, count
+
+
+def write_json(f: TextIO, chunks: Iterable[List[int]]):
+    """Write words as a JSON array incrementally.
+
+    The output is byte-for-byte what json.dump(words, f, indent=2) gives.
+    """
+    first = True
+    for chunk in chunks:
+        if not chunk:
+            continue
+        f.write("[\n  " if first else ",\n  ")
+        f.write(",\n  ".join(map(str, chunk)))
+        first = False
+    f.write("[]" if first else "\n]")
+
+
+def write_ndjson(f: TextIO, chunks: Iterable[List[int]], start: int):
+    """Write one {"start": addr, "values": [...]} line per chunk."""
+    addr = start
+    for chunk in chunks:
+        if not chunk:
+            continue
+        f.write(json.dumps({"start": addr, "values": chunk}))
+        f.write("\n")
+        addr += len(chunk)
+
+
+def binary_header(start: int, count: int) -> bytes:
+    return _HEADER.pack(BINARY_MAGIC, BINARY_VERSION, start, count)
+
+
+def iter_binary(chunks: Iterable[List[int]]) -> Iterator[bytes]:
+    """Encode chunks of words as little-endian u64 bytes."""
+    for chunk in chunks:
+        if not chunk:
+            continue
+        words = array("Q", chunk)
+        if sys.byteorder != "little":
+            words.byteswap()
+        yield words.tobytes()
+
+
+def iter_binary_dump(
+    chunks: Iterable[List[int]], start: int, count: int
+) -> Iterator[bytes]:
+    """Yield a complete binary dump: header first, then the words."""
+    yield binary_header(start, count)
+    yield from iter_binary(chunks)
+
+
+def write_binary(f: BinaryIO, chunks: Iterable[List[int]], start: int, count: int):
+    for piece in iter_binary_dump(chunks, start, count):
+        f.write(piece)
+
+
+def _quality(params) -> float:
+    for param in params:
+        name, _, value = param.partition("=")
+        if name.strip().lower() == "q":
+            try:
+                return min(1.0, max(0.0, float(value)))
+            except ValueError:
+                return 0.0
+    return 1.0
+
+
+def accepts_binary(accept: str | None) -> bool:
+    """True if an HTTP Accept header prefers the binary dump format to JSON.
+
+    The binary format must be named explicitly with a non-zero q-value at
+    least as high as JSON's (from application/json or a wildcard); a tie
+    with an explicitly named application/json goes to JSON.
+    """
+    ranges = {}
+    for item in (accept or "").split(","):
+        media_type, *params = [part.strip() for part in item.split(";")]
+        ranges[media_type.lower()] = _quality(params)
+
+    binary_q = max(
+        ranges.get(BINARY_MEDIA_TYPE, 0.0), ranges.get("application/octet-stream", 0.0)
+    )
+    json_types = ("application/json", "application/*", "*/*")
+    json_q = next((ranges[t] for t in json_types if t in ranges), 0.0)
+    if binary_q == 0.0 or binary_q < json_q:
+        return False
+    return binary_q > json_q or "application/json" not in ranges
+
+
+@dataclass
+class BinaryDump:
+    start: int
+    count: int
+    words: Sequence[int]  # memoryview over a mapping, or an array('Q')
+    _mmap: mmap.mmap | None = None
+
+    def close(self):
+        if self._mmap is not None:
+            if isinstance(self.words, memoryview):
+                self.words.release()
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_binary_dump(path: str, use_mmap: bool = True) -> BinaryDump:
+    """Open a binary dump; with use_mmap the words are read lazily from a mapping."""
+    with open(path, "rb") as f:
+        header = f.read(_HEADER.size)
+        if len(header) != _HEADER.size:
+            raise ValueError("Truncated dump header")
+        magic, version, start, count = _HEADER.unpack(header)
+        if magic != BINARY_MAGIC:
+            raise ValueError("Not a UVM binary dump")
+        if version != BINARY_VERSION:
+            raise ValueError(f"Unsupported dump version {version}")
+
+        end = _HEADER.size + 8 * count
+        if use_mmap and count and sys.byteorder == "little":
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            if len(mm) < end:
+                mm.close()
+                raise ValueError("Truncated dump body")
+            words = memoryview(mm)[_HEADER.size : end].cast("Q")
+            return BinaryDump(start, count, words, mm)
+
+        words = array("Q")
+        body = f.read(8 * count)
+        if len(body) != 8 * count:
+            raise ValueError("Truncated dump body")
+        words.frombytes(body)
+        if sys.byteorder != "little":
+            words.byteswap()
+        return BinaryDump(start, count, words)
@@ -1,4 +1,10 @@
-from model import Op, Instr
+from itertools import islice
+from typing import BinaryIO, Iterable
+
+from codec import encode_columns
+from model import Instr, Op, Program
+
+WRITE_BATCH = 65536  # instructions encoded per write in write_program
 
 
 def encode_const(ins: Instr) -> int:
@@ -36,8 +42,29 @@ def encode_instr(ins: Instr) -> bytes:
     return bytes((word >> (8 * i)) & 0xFF for i in range(11))
 
 
-def encode_program(program: list[Instr]) -> bytes:
-    data = bytearray()
-    for ins in program:
-        data += encode_instr(ins)
-    return bytes(data)
+def encode_program(program: list[Instr] | Program) -> bytes:
+    if isinstance(program, Program):
+        return encode_columns(program.ops, program.b, program.c, program.d)
+    ops = [ins.A for ins in program]
+    b = [ins.B for ins in program]
+    c = [ins.C for ins in program]
+    d = [ins.D for ins in program]
+    return encode_columns(ops, b, c, d)
+
+
+def write_program(
+    program: Iterable[Instr] | Program, f: BinaryIO, batch: int = WRITE_BATCH
+) -> int:
+    """Encode instructions batch by batch straight into f; returns the count."""
+    if isinstance(program, Program):
+        for lo in range(0, len(program), batch):
+            f.write(encode_program(program[lo : lo + batch]))
+        return len(program)
+    it = iter(program)
+    count = 0
+    while True:
+        chunk = list(islice(it, batch))
+        if not chunk:
+            return count
+        f.write(encode_program(chunk))
+        count += len(chunk)
@@ -0,0 +1,158 @@
+"""Shared execution core used by the CLI interpreter, the GUI and the web server.
+
+A backend turns a binary into a prepared program (load) and executes a
+range of its instructions (run). execute() drives a backend in chunks of
+CHECK_INTERVAL instructions, checking the wall-clock deadline and the
+cancellation hook between chunks. Execution starts at vm.ip, so a VM
+restored from a snapshot continues where it stopped.
+"""
+
+import time
+from typing import Callable
+
+from codegen import CompiledProgram, compile_binary
+from fusion import FusedProgram, execute_fused, fuse
+from predecode import PredecodedProgram, predecode, run_predecoded
+from vm import VM
+
+CHECK_INTERVAL = 4096
+CHECKPOINT_EVERY = 1_000_000
+
+
+class ExecutionError(RuntimeError):
+    pass
+
+
+class BudgetExceeded(ExecutionError):
+    pass
+
+
+class DeadlineExceeded(ExecutionError):
+    pass
+
+
+class ExecutionCancelled(ExecutionError):
+    pass
+
+
+class PredecodedBackend:
+    name = "predecoded"
+
+    def load(self, code) -> PredecodedProgram:
+        return predecode(code)
+
+    def run(self, program: PredecodedProgram, vm: VM, start: int, stop: int):
+        run_predecoded(program, vm, start, stop)
+
+
+class CompiledBackend:
+    name = "compiled"
+
+    def load(self, code) -> CompiledProgram:
+        return compile_binary(code, CHECK_INTERVAL)
+
+    def run(self, program: CompiledProgram, vm: VM, start: int, stop: int):
+        # Whole blocks run compiled; the ragged ends of an unaligned range
+        # (resumed runs, checkpoints) go through the pre-decoded loop.
+        mem = vm.mem
+        bs = program.block_size
+        first = -(-start // bs)
+        last = len(program.blocks) if stop >= program.length else stop // bs
+        if first >= last:
+            run_predecoded(program.columns, vm, start, stop)
+            return
+        if start < first * bs:
+            run_predecoded(program.columns, vm, start, first * bs)
+        for block in program.blocks[first:last]:
+            block(mem)
+        if last * bs < stop:
+            run_predecoded(program.columns, vm, last * bs, stop)
+
+
+class FusedBackend:
+    name = "fused"
+
+    def load(self, code) -> FusedProgram:
+        return fuse(predecode(code), CHECK_INTERVAL)
+
+    def run(self, program: FusedProgram, vm: VM, start: int, stop: int):
+        execute_fused(program, vm, start, stop)
+
+
+BACKENDS = {
+    backend.name: backend
+    for backend in (PredecodedBackend(), CompiledBackend(), FusedBackend())
+}
+
+
+def get_backend(backend):
+    if isinstance(backend, str):
+        try:
+            return BACKENDS[backend]
+        except KeyError:
+            raise ValueError(f"Unknown backend: {backend}") from None
+    return backend
+
+
+def load(code, backend="predecoded"):
+    return get_backend(backend).load(code)
+
+
+def check_budget(program, max_instructions: int | None):
+    if max_instructions is not None and len(program) > max_instructions:
+        raise BudgetExceeded(
+            f"Program has {len(program)} instructions, budget is {max_instructions}"
+        )
+
+
+def execute(
+    program,
+    vm: VM,
+    backend="predecoded",
+    max_instructions: int | None = None,
+    deadline: float | None = None,
+    cancel: Callable[[], bool] | None = None,
+    checkpoint_every: int = CHECKPOINT_EVERY,
+    on_checkpoint: Callable[[VM], None] | None = None,
+) -> int:
+    """Run a program prepared by load() on vm and return the instruction count.
+
+    Programs are straight-line, so the instruction budget is checked up
+    front against the program length. deadline is a time.monotonic()
+    timestamp; cancel is polled between chunks and stops the run when it
+    returns True. on_checkpoint(vm) is called whenever vm.ip reaches a
+    multiple of checkpoint_every before the end of the program.
+    """
+    backend = get_backend(backend)
+    total = len(program)
+    check_budget(program, max_instructions)
+
+    if deadline is None and cancel is None and on_checkpoint is None:
+        backend.run(program, vm, vm.ip, total)
+        vm.ip = total
+        return total
+
+    if checkpoint_every <= 0:
+        raise ValueError("checkpoint_every must be positive")
+    next_checkpoint = (vm.ip // checkpoint_every + 1) * checkpoint_every
+
+    while vm.ip < total:
+        start = vm.ip
+        if deadline is not None and time.monotonic() > deadline:
+            raise DeadlineExceeded(f"Deadline exceeded after {start} instructions")
+        if cancel is not None and cancel():
+            raise ExecutionCancelled(f"Cancelled after {start} instructions")
+        stop = min((start // CHECK_INTERVAL + 1) * CHECK_INTERVAL, total)
+        if on_checkpoint is not None:
+            stop = min(stop, next_checkpoint)
+        backend.run(program, vm, start, stop)
+        vm.ip = stop
+        if on_checkpoint is not None and stop == next_checkpoint < total:
+            on_checkpoint(vm)
+            next_checkpoint += checkpoint_every
+
+    return total
+
+
+def run_binary(code, vm: VM, backend="predecoded", **limits) -> int:
+    return execute(load(code, backend), vm, backend, **limits)
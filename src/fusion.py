@@ -0,0 +1,159 @@
+"""Superinstruction fusion over pre-decoded programs.
+
+Generated programs are dominated by runs such as
+
+    CONST v0, 100 / CONST v1, 101 / ...          (fill a vector)
+    BITREV 10, 0, 200 / BITREV 10, 1, 201 / ...  (strided bit-reverse)
+    LOAD 40, 300 / LOAD 41, 301 / ...            (gather through pointers)
+
+fuse() finds such runs and execute_fused() runs each one as a few slice
+operations instead of one interpreter step per instruction. Every fused
+run checks, when it executes, that reading all inputs before writing any
+output gives the same result as the sequential order (no aliasing between
+the cells written and the cells or pointers read) and that every address
+is in range; otherwise it falls back to the pre-decoded loop, which also
+raises IndexError at exactly the same instruction.
+"""
+
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import List
+
+from bitutils import bitreverse64_many
+from predecode import (
+    OP_BITREV,
+    OP_CONST,
+    OP_LOAD,
+    PredecodedProgram,
+    run_predecoded,
+)
+from vm import VM
+
+MIN_RUN = 4  # shorter runs are cheaper to interpret
+
+
+@dataclass
+class FusedRun:
+    start: int  # index of the first instruction
+    length: int
+    op: int
+    b: int  # first B operand
+    c: int  # first C operand
+    d: int  # first D operand (BITREV)
+    values: array | None = None  # CONST immediates
+
+
+@dataclass
+class FusedProgram:
+    columns: PredecodedProgram
+    runs: List[FusedRun] = field(default_factory=list)
+    starts: List[int] = field(default_factory=list)  # run starts, for bisect
+
+    def __len__(self) -> int:
+        return len(self.columns)
+
+    @property
+    def fused_instructions(self) -> int:
+        return sum(run.length for run in self.runs)
+
+
+def _run_length(program: PredecodedProgram, i: int, limit: int) -> int:
+    """Length of the fusable run starting at instruction i, up to limit."""
+    ops, bs, cs, ds = program.ops, program.b, program.c, program.d
+    op = ops[i]
+    if op not in (OP_CONST, OP_BITREV, OP_LOAD):
+        return 1
+    n = 1
+    while i + n < limit and ops[i + n] == op and cs[i + n] == cs[i] + n:
+        j = i + n
+        if op == OP_BITREV and (bs[j] != bs[i] or ds[j] != ds[i] + n):
+            break
+        if op == OP_LOAD and bs[j] != bs[i] + n:
+            break
+        n += 1
+    return n
+
+
+def fuse(program: PredecodedProgram, interval: int) -> FusedProgram:
+    """Find fusable runs in a pre-decoded program.
+
+    No run crosses a multiple of interval, so execute() can still stop
+    between any two of its chunks.
+    """
+    fused = FusedProgram(program)
+    i = 0
+    total = len(program)
+    while i < total:
+        limit = min(total, (i // interval + 1) * interval)
+        n = _run_length(program, i, limit)
+        op, b, c = program.ops[i], program.b[i], program.c[i]
+        # A LOAD run writing its own pointer cells is inherently sequential.
+        overlapping = op == OP_LOAD and b < c + n and c < b + n
+        if n >= MIN_RUN and not overlapping:
+            values = None
+            if op == OP_CONST:
+                values = array("Q", program.b[i : i + n])
+            fused.runs.append(FusedRun(i, n, op, b, c, program.d[i], values))
+            fused.starts.append(i)
+        i += n
+    return fused
+
+
+def _run_fused(run: FusedRun, mem) -> bool:
+    """Execute one run in bulk; False if it must run sequentially instead."""
+    n = run.length
+    c0, c1 = run.c, run.c + n
+    size = len(mem)
+    if c1 > size:
+        return False
+
+    if run.op == OP_CONST:
+        mem[c0:c1] = run.values
+        return True
+
+    if run.op == OP_BITREV:
+        if c0 <= run.b < c1:
+            return False  # the base pointer is overwritten mid-run
+        lo = mem[run.b] + run.d
+        hi = lo + n
+        # Reading ahead of the writes is only wrong if a source cell is
+        # written by an earlier element, i.e. the source starts below c0.
+        if hi > size or lo < c0 < hi:
+            return False
+        mem[c0:c1] = bitreverse64_many(mem[lo:hi])
+        return True
+
+    # LOAD: gather through n consecutive pointer cells.
+    b1 = run.b + n
+    if b1 > size:
+        return False
+    pointers = mem[run.b : b1]
+    if max(pointers) >= size:
+        return False
+    if not (max(pointers) < c0 or min(pointers) >= c1):
+        return False
+    mem[c0:c1] = array("Q", map(mem.__getitem__, pointers))
+    return True
+
+
+def execute_fused(program: FusedProgram, vm: VM, start: int, stop: int):
+    """Execute instructions [start, stop) of a fused program on vm."""
+    mem = vm.mem
+    columns = program.columns
+    runs = program.runs
+    k = bisect_left(program.starts, start)
+    pos = start
+    while pos < stop:
+        if k == len(runs) or runs[k].start >= stop:
+            run_predecoded(columns, vm, pos, stop)
+            return
+        run = runs[k]
+        k += 1
+        if pos < run.start:
+            run_predecoded(columns, vm, pos, run.start)
+        end = run.start + run.length
+        if end > stop or not _run_fused(run, mem):
+            end = min(end, stop)
+            run_predecoded(columns, vm, run.start, end)
+        pos = end
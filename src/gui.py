@@ -1,15 +1,15 @@
+import queue
+import threading
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 
-from assembler_ir import parse_program
-from encode import encode_program
-from decode import decode_instr
+from engine import ExecutionCancelled, execute, load
+from incremental import IncrementalAssembler
+from profiler import Profile, ProfileBackend, timed
 from vm import VM
-from bitutils import bitreverse64
-from model import Op
 
 
-INSTR_SIZE = 11  # 11 bytes per instruction
+POLL_MS = 50  # how often the Tk loop checks for a finished run
 
 
 class UVMGui(tk.Tk):
@@ -19,6 +19,11 @@ class UVMGui(tk.Tk):
         self.title("UVM Assembler & Interpreter")
         self.geometry("1000x600")
 
+        self.assembler = IncrementalAssembler()
+        self._results: queue.Queue = queue.Queue()
+        self._cancel = threading.Event()
+        self._worker: threading.Thread | None = None
+
         self._build_ui()
 
     # ------------------------------------------------------------------
@@ -43,6 +48,11 @@ class UVMGui(tk.Tk):
             side=tk.LEFT, padx=(0, 10)
         )
 
+        self.profile_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(top_frame, text="Profile", variable=self.profile_var).pack(
+            side=tk.LEFT, padx=(0, 10)
+        )
+
         # Кнопки
         ttk.Button(
             top_frame, text="Open .asm", command=self.on_open_asm
@@ -51,9 +61,14 @@ class UVMGui(tk.Tk):
             top_frame, text="Save .asm", command=self.on_save_asm
         ).pack(side=tk.LEFT, padx=5)
 
-        ttk.Button(
+        self.stop_button = ttk.Button(
+            top_frame, text="Stop", command=self.on_stop, state=tk.DISABLED
+        )
+        self.stop_button.pack(side=tk.RIGHT, padx=5)
+        self.run_button = ttk.Button(
             top_frame, text="Assemble & Run", command=self.on_assemble_and_run
-        ).pack(side=tk.RIGHT, padx=5)
+        )
+        self.run_button.pack(side=tk.RIGHT, padx=5)
 
         # Основная область: слева код, справа результат
         main_frame = ttk.PanedWindow(self, orient=tk.HORIZONTAL)
@@ -157,64 +172,68 @@ class UVMGui(tk.Tk):
             return
 
         try:
-            # 1) parse assembly
-            program = parse_program(asm_text)
-
-            # 2) encode to machine code (in memory)
-            binary = encode_program(program)
-
-            # 3) run interpreter logic in memory
-            vm = VM()
-            self._execute_binary_on_vm(binary, vm)
-
-            # 4) dump memory range
-            fragment = vm.mem[dump_start:dump_end]
-
-            # 5) show result
-            self._show_dump(program, fragment, dump_start)
-
+            # 1) parse + encode, reusing every line unchanged since the last run
+            program, binary = self.assembler.assemble(asm_text)
         except Exception as e:
             messagebox.showerror("Error", f"Error during assemble/run:\n{e}")
+            return
+
+        # 2) run the VM in a worker thread so the window stays responsive
+        profile = Profile() if self.profile_var.get() else None
+        self._cancel.clear()
+        self.run_button.configure(state=tk.DISABLED)
+        self.stop_button.configure(state=tk.NORMAL)
+        self._worker = threading.Thread(
+            target=self._run_worker,
+            args=(program, binary, dump_start, dump_end, profile),
+            daemon=True,
+        )
+        self._worker.start()
+        self.after(POLL_MS, self._poll_worker)
+
+    def on_stop(self):
+        self._cancel.set()
 
     # ------------------------------------------------------------------
     # VM execution (same semantics as interpreter.py)
     # ------------------------------------------------------------------
-    def _execute_binary_on_vm(self, binary: bytes, vm: VM):
-        ip = 0
-        while ip + INSTR_SIZE <= len(binary):
-            raw = binary[ip : ip + INSTR_SIZE]
-            ip += INSTR_SIZE
-
-            instr = decode_instr(raw)
-
-            if instr.op == Op.CONST:
-                vm.store_word(instr.C, instr.B)
-
-            elif instr.op == Op.LOAD:
-                addr = vm.load_word(instr.B)
-                value = vm.load_word(addr)
-                vm.store_word(instr.C, value)
-
-            elif instr.op == Op.STORE:
-                addrB = vm.load_word(instr.B)
-                value = vm.load_word(addrB)
-                a1 = vm.load_word(instr.C)
-                a2 = vm.load_word(a1)
-                vm.store_word(a2, value)
-
-            elif instr.op == Op.BITREV:
-                base = vm.load_word(instr.B)
-                src_addr = base + instr.D
-                value = vm.load_word(src_addr)
-                vm.store_word(instr.C, bitreverse64(value))
-
-            else:
-                raise RuntimeError(f"Unknown op: {instr.op}")
+    def _execute_binary_on_vm(self, binary: bytes, vm: VM, profile=None):
+        backend = "predecoded" if profile is None else ProfileBackend(profile)
+        program = load(binary, backend)
+        with timed(profile, "execute"):
+            execute(program, vm, backend, cancel=self._cancel.is_set)
+
+    def _run_worker(self, program, binary, dump_start, dump_end, profile=None):
+        # Runs off the Tk thread: must not touch any widget.
+        try:
+            vm = VM()
+            self._execute_binary_on_vm(binary, vm, profile)
+            with timed(profile, "dump"):
+                fragment = vm.dump(dump_start, dump_end)
+            self._results.put((None, program, fragment, dump_start, profile))
+        except Exception as e:
+            self._results.put((e, None, None, None, None))
+
+    def _poll_worker(self):
+        try:
+            error, program, fragment, dump_start, profile = self._results.get_nowait()
+        except queue.Empty:
+            self.after(POLL_MS, self._poll_worker)
+            return
+
+        self.run_button.configure(state=tk.NORMAL)
+        self.stop_button.configure(state=tk.DISABLED)
+        if isinstance(error, ExecutionCancelled):
+            messagebox.showinfo("Stopped", str(error))
+        elif error is not None:
+            messagebox.showerror("Error", f"Error during assemble/run:\n{error}")
+        else:
+            self._show_dump(program, fragment, dump_start, profile)
 
     # ------------------------------------------------------------------
     # Output formatting
     # ------------------------------------------------------------------
-    def _show_dump(self, program, fragment, start_addr: int):
+    def _show_dump(self, program, fragment, start_addr: int, profile=None):
         self.text_output.configure(state=tk.NORMAL)
         self.text_output.delete("1.0", tk.END)
 
@@ -227,6 +246,10 @@ class UVMGui(tk.Tk):
             addr = start_addr + i
             self.text_output.insert(tk.END, f"[{addr:4d}] = {val}\n")
 
+        if profile is not None:
+            self.text_output.insert(tk.END, "\n=== Profile ===\n")
+            self.text_output.insert(tk.END, profile.format() + "\n")
+
         self.text_output.configure(state=tk.NORMAL)
 
     # ------------------------------------------------------------------
@@ -0,0 +1,43 @@
+from typing import Dict, List, Tuple
+
+from assembler_ir import AsmSyntaxError, parse_line
+from encode import encode_instr
+from model import Instr
+
+
+class IncrementalAssembler:
+    """Assembler that re-parses only the lines that changed since the last run.
+
+    Parsed instructions and their encoded bytes are cached per line text, so
+    unchanged (or moved) lines are reused as is.
+    """
+
+    def __init__(self):
+        self._cache: Dict[str, Tuple[Instr | None, bytes]] = {}
+        self.reparsed = 0  # lines parsed by the last assemble() call
+
+    def assemble(self, text: str) -> Tuple[List[Instr], bytes]:
+        cache = {}
+        program = []
+        chunks = []
+        self.reparsed = 0
+
+        for lineno, line in enumerate(text.splitlines(), start=1):
+            entry = cache.get(line) or self._cache.get(line)
+            if entry is None:
+                try:
+                    instr = parse_line(line)
+                except ValueError as exc:
+                    raise AsmSyntaxError(lineno, str(exc)) from None
+                entry = (instr, encode_instr(instr) if instr else b"")
+                self.reparsed += 1
+            cache[line] = entry
+
+            instr, encoded = entry
+            if instr:
+                program.append(instr)
+                chunks.append(encoded)
+
+        # Keep only the current lines so the cache tracks the editor buffer.
+        self._cache = cache
+        return program, b"".join(chunks)
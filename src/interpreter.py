@@ -1,9 +1,30 @@
 import argparse
-import json
-from vm import VM
-from decode import decode_instr
-from bitutils import bitreverse64
-from model import Op
+import hashlib
+import time
+from contextlib import ExitStack
+from functools import partial
+from vm import ADDRESS_SPACE, MEM_SIZE, VM
+from build_cache import DEFAULT_MAX_BYTES, BuildCache, binary_key
+from dumpio import DUMP_FORMATS, write_binary, write_json, write_ndjson
+from engine import BACKENDS, CHECKPOINT_EVERY, execute, load
+from loader import map_binary
+from predecode import predecode
+from profiler import Profile, ProfileBackend, timed
+from snapshot import load_snapshot, save_snapshot
+from tracing import TRACE_BUFFER, TraceBackend, TraceRecorder
+
+
+def predecode_cached(code, cache: BuildCache):
+    """predecode(code), reusing the copy in cache if there is one."""
+    key = binary_key(code)
+    try:
+        program = cache.load_predecoded(key)
+    except ValueError:  # written by another format version; rebuild it
+        program = None
+    if program is None:
+        program = predecode(code)
+        cache.store_predecoded(key, program)
+    return program
 
 
 def run_program(
@@ -11,48 +32,93 @@ def run_program(
     dump_path: str,
     dump_start: int,
     dump_end: int,
+    mem_size: int = MEM_SIZE,
+    paged: bool = False,
+    backend: str = "predecoded",
+    max_instructions: int | None = None,
+    deadline: float | None = None,
+    dump_format: str = "json",
+    profile: Profile | None = None,
+    checkpoint: str | None = None,
+    checkpoint_every: int = CHECKPOINT_EVERY,
+    resume: str | None = None,
+    trace: str | None = None,
+    trace_buffer: int = TRACE_BUFFER,
+    cache: BuildCache | None = None,
 ):
-    vm = VM()
-
-    with open(bin_path, "rb") as f:
-        code = f.read()
-
-    ip = 0
-
-    while ip + 11 <= len(code):
-        raw = code[ip : ip + 11]
-        ip += 11
-
-        instr = decode_instr(raw)
-
-        if instr.op == Op.CONST:
-            vm.store_word(instr.C, instr.B)
-
-        elif instr.op == Op.LOAD:
-            addr = vm.load_word(instr.B)
-            value = vm.load_word(addr)
-            vm.store_word(instr.C, value)
-
-        elif instr.op == Op.STORE:
-            addrB = vm.load_word(instr.B)
-            value = vm.load_word(addrB)
-            a1 = vm.load_word(instr.C)
-            a2 = vm.load_word(a1)
-            vm.store_word(a2, value)
-
-        elif instr.op == Op.BITREV:
-            base = vm.load_word(instr.B)
-            src = base + instr.D
-            value = vm.load_word(src)
-            vm.store_word(instr.C, bitreverse64(value))
-
+    """Run a binary and write a memory dump.
+
+    Passing a Profile swaps in the instrumented backend and fills it with
+    opcode counts, memory accesses and decode/execute/dump timings. With
+    checkpoint, the VM state is saved there every checkpoint_every
+    instructions; resume continues from such a file, whose memory size and
+    layout then replace mem_size and paged. trace names a file that
+    receives a record of every executed instruction (see tracing.py).
+    With a BuildCache, the pre-decoded program is read from and stored
+    there instead of decoding the binary on every run; the compiled
+    backend works from the binary and ignores it.
+    """
+    if profile is not None and trace is not None:
+        raise ValueError("Profiling and tracing cannot be combined")
+    if profile is not None:
+        backend = ProfileBackend(profile)
+    with ExitStack() as stack:
+        recorder = None
+        if trace is not None:
+            sink = stack.enter_context(open(trace, "wb"))
+            recorder = TraceRecorder(trace_buffer, sink)
+            # Flushed on failure too (callbacks run before the file closes):
+            # the tail of the trace shows what led up to the fault.
+            stack.callback(recorder.flush)
+            backend = TraceBackend(recorder)
+
+        program_hash = None
+        with map_binary(bin_path) as code:
+            if checkpoint is not None or resume is not None:
+                program_hash = hashlib.sha256(code).digest()
+            if cache is not None and backend != "compiled":
+                program = load(predecode_cached(code, cache), backend)
+            else:
+                program = load(code, backend)
+
+        if resume is not None:
+            vm, saved_hash = load_snapshot(resume)
+            if saved_hash != program_hash:
+                raise ValueError(f"{resume} is a checkpoint of a different program")
         else:
-            raise RuntimeError("Unknown instruction")
-
-    fragment = vm.mem[dump_start:dump_end]
-
-    with open(dump_path, "w", encoding="utf-8") as f:
-        json.dump(fragment, f, indent=2)
+            vm = VM(mem_size, paged)
+
+        on_checkpoint = None
+        if checkpoint is not None:
+            on_checkpoint = partial(
+                save_snapshot, path=checkpoint, program_hash=program_hash
+            )
+
+        with timed(profile, "execute"):
+            execute(
+                program,
+                vm,
+                backend,
+                max_instructions,
+                deadline,
+                checkpoint_every=checkpoint_every,
+                on_checkpoint=on_checkpoint,
+            )
+
+    chunks = vm.iter_dump(dump_start, dump_end)
+    if profile is not None:
+        chunks = profile.timed_iter("dump", chunks)
+    first, last, _ = slice(dump_start, dump_end).indices(len(vm.mem))
+
+    if dump_format == "bin":
+        with open(dump_path, "wb") as f:
+            write_binary(f, chunks, first, max(0, last - first))
+    else:
+        with open(dump_path, "w", encoding="utf-8") as f:
+            if dump_format == "ndjson":
+                write_ndjson(f, chunks, first)
+            else:
+                write_json(f, chunks)
 
     print(f"Memory dumped to {dump_path}")
 
@@ -60,12 +126,102 @@ def run_program(
 def main():
     parser = argparse.ArgumentParser(description="UVM Interpreter")
     parser.add_argument("bin", help="Program binary")
-    parser.add_argument("dump", help="Output JSON memory dump")
+    parser.add_argument("dump", help="Output memory dump")
     parser.add_argument("start", type=int)
     parser.add_argument("end", type=int)
+    parser.add_argument(
+        "--mem-size",
+        type=int,
+        help=f"VM memory size in words (default {MEM_SIZE}, or the full "
+        "address space with --paged)",
+    )
+    parser.add_argument(
+        "--paged", action="store_true", help="Use sparse paged memory"
+    )
+    parser.add_argument(
+        "--backend",
+        choices=sorted(BACKENDS),
+        default="predecoded",
+        help="Execution backend",
+    )
+    parser.add_argument(
+        "--max-instructions", type=int, help="Refuse programs longer than this"
+    )
+    parser.add_argument(
+        "--timeout", type=float, help="Wall-clock limit for execution in seconds"
+    )
+    parser.add_argument(
+        "--format",
+        choices=DUMP_FORMATS,
+        default="json",
+        help="Dump format: JSON array, chunked NDJSON or binary u64 words",
+    )
+    parser.add_argument(
+        "--checkpoint", help="Save VM state to this file periodically"
+    )
+    parser.add_argument(
+        "--checkpoint-every",
+        type=int,
+        default=CHECKPOINT_EVERY,
+        help=f"Instructions between checkpoints (default {CHECKPOINT_EVERY})",
+    )
+    parser.add_argument("--resume", help="Continue from a checkpoint file")
+    parser.add_argument("--trace", help="Record every instruction to this file")
+    parser.add_argument(
+        "--trace-buffer",
+        type=int,
+        default=TRACE_BUFFER,
+        help=f"Trace records buffered in memory (default {TRACE_BUFFER})",
+    )
+    parser.add_argument(
+        "--cache-dir", help="Reuse pre-decoded programs stored in this directory"
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=DEFAULT_MAX_BYTES // (1024 * 1024),
+        help="Cache size limit in MiB; least recently used entries go first",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Report opcode counts, memory accesses and phase timings",
+    )
     args = parser.parse_args()
 
-    run_program(args.bin, args.dump, args.start, args.end)
+    mem_size = args.mem_size
+    if mem_size is None:
+        mem_size = ADDRESS_SPACE if args.paged else MEM_SIZE
+
+    profile = Profile() if args.profile else None
+    cache = None
+    if args.cache_dir:
+        cache = BuildCache(args.cache_dir, args.cache_size * 1024 * 1024)
+    deadline = None
+    if args.timeout is not None:
+        deadline = time.monotonic() + args.timeout
+
+    run_program(
+        args.bin,
+        args.dump,
+        args.start,
+        args.end,
+        mem_size,
+        args.paged,
+        args.backend,
+        args.max_instructions,
+        deadline,
+        args.format,
+        profile,
+        args.checkpoint,
+        args.checkpoint_every,
+        args.resume,
+        args.trace,
+        args.trace_buffer,
+        cache,
+    )
+    if profile is not None:
+        print(profile.format())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,37 @@
+import mmap
+import os
+from contextlib import contextmanager
+from typing import Iterator
+
+INSTR_SIZE = 11
+
+
+@contextmanager
+def map_binary(path: str) -> Iterator[memoryview]:
+    """Map a program binary read-only and yield a memoryview over it.
+
+    The view (and any slice taken from it) must not outlive the block.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield memoryview(b"")
+            return
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            view = memoryview(mm)
+            try:
+                yield view
+            finally:
+                view.release()
+
+
+def instr_count(buf) -> int:
+    return memoryview(buf).nbytes // INSTR_SIZE
+
+
+def iter_words(buf) -> Iterator[int]:
+    """Yield each 11-byte instruction word of buf as an int, without copying."""
+    with memoryview(buf) as view, view.cast("B") as raw:
+        from_bytes = int.from_bytes
+        for ip in range(0, len(raw) - INSTR_SIZE + 1, INSTR_SIZE):
+            yield from_bytes(raw[ip : ip + INSTR_SIZE], "little")
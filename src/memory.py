@@ -0,0 +1,96 @@
+from array import array
+from typing import Iterable
+
+PAGE_SIZE = 4096  # words per page
+
+
+class PagedMemory:
+    """Sparse word memory that allocates fixed-size pages on first write.
+
+    Supports the same indexing and slicing as array('Q'), so it can be
+    used wherever VM.mem is; untouched pages read back as zero.
+    """
+
+    def __init__(self, size: int, page_size: int = PAGE_SIZE):
+        if page_size <= 0 or page_size & (page_size - 1):
+            raise ValueError("Page size must be a power of two")
+        self.size = size
+        self.page_size = page_size
+        self.pages: dict[int, array] = {}
+        self._shift = page_size.bit_length() - 1
+        self._mask = page_size - 1
+        self._zero_page = bytes(8 * page_size)
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def resident_pages(self) -> int:
+        return len(self.pages)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return self._read_range(key)
+        if not 0 <= key < self.size:
+            raise IndexError("memory address out of range")
+        page = self.pages.get(key >> self._shift)
+        if page is None:
+            return 0
+        return page[key & self._mask]
+
+    def __setitem__(self, key, value):
+        if isinstance(key, slice):
+            self._write_range(key, value)
+            return
+        if not 0 <= key < self.size:
+            raise IndexError("memory address out of range")
+        page = self.pages.get(key >> self._shift)
+        if page is None:
+            if value == 0:
+                return  # untouched pages already read as zero
+            page = self.pages[key >> self._shift] = array("Q", self._zero_page)
+        page[key & self._mask] = value
+
+    def _range(self, key: slice) -> tuple[int, int]:
+        start, stop, step = key.indices(self.size)
+        if step != 1:
+            raise ValueError("PagedMemory slices must have step 1")
+        return start, max(start, stop)
+
+    def _read_range(self, key: slice) -> array:
+        start, stop = self._range(key)
+        out = array("Q")
+        addr = start
+        while addr < stop:
+            page_no = addr >> self._shift
+            lo = addr & self._mask
+            hi = min(self.page_size, lo + stop - addr)
+            page = self.pages.get(page_no)
+            if page is None:
+                out.frombytes(self._zero_page[: 8 * (hi - lo)])
+            else:
+                out.extend(page[lo:hi])
+            addr += hi - lo
+        return out
+
+    def _write_range(self, key: slice, values: Iterable[int]):
+        start, stop = self._range(key)
+        if not isinstance(values, array) or values.typecode != "Q":
+            values = array("Q", values)
+        if len(values) != stop - start:
+            raise ValueError("PagedMemory cannot change size on slice assignment")
+
+        addr = start
+        while addr < stop:
+            page_no = addr >> self._shift
+            lo = addr & self._mask
+            hi = min(self.page_size, lo + stop - addr)
+            chunk = values[addr - start : addr - start + hi - lo]
+            page = self.pages.get(page_no)
+            if page is None:
+                if not any(chunk):
+                    addr += hi - lo
+                    continue
+                page = self.pages[page_no] = array("Q", self._zero_page)
+            page[lo:hi] = chunk
+            addr += hi - lo
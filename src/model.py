@@ -1,5 +1,8 @@
-from dataclasses import dataclass
+from array import array
+from dataclasses import dataclass, field
 from enum import Enum, auto
+from itertools import repeat
+from typing import Iterable, Iterator
 
 
 class Op(Enum):
@@ -9,6 +12,13 @@ class Op(Enum):
     BITREV = auto()     # A = 9
 
 
+OPS_BY_CODE = {4: Op.CONST, 12: Op.LOAD, 3: Op.STORE, 9: Op.BITREV}
+
+_MASK7 = (1 << 7) - 1
+_MASK23 = (1 << 23) - 1
+_MASK26 = (1 << 26) - 1
+
+
 @dataclass
 class Instr:
     op: Op
@@ -16,3 +26,87 @@ class Instr:
     B: int
     C: int
     D: int = 0
+
+
+class InstrView:
+    """One instruction of a Program, read through to its columns."""
+
+    __slots__ = ("program", "index")
+
+    def __init__(self, program: "Program", index: int):
+        self.program = program
+        self.index = index
+
+    @property
+    def op(self) -> Op:
+        return OPS_BY_CODE[self.program.ops[self.index]]
+
+    @property
+    def A(self) -> int:
+        return self.program.ops[self.index]
+
+    @property
+    def B(self) -> int:
+        return self.program.b[self.index]
+
+    @property
+    def C(self) -> int:
+        return self.program.c[self.index]
+
+    @property
+    def D(self) -> int:
+        return self.program.d[self.index]
+
+    def to_instr(self) -> Instr:
+        return Instr(self.op, self.A, self.B, self.C, self.D)
+
+    def __eq__(self, other):
+        if not isinstance(other, (Instr, InstrView)):
+            return NotImplemented
+        return (self.A, self.B, self.C, self.D) == (other.A, other.B, other.C, other.D)
+
+    def __repr__(self) -> str:
+        return repr(self.to_instr())
+
+
+@dataclass
+class Program:
+    """Instructions as parallel typed columns instead of one object each.
+
+    ops holds the raw A nibble. Operands are stored masked to their field
+    width, exactly as they will be encoded.
+    """
+
+    ops: array = field(default_factory=lambda: array("B"))
+    b: array = field(default_factory=lambda: array("I"))
+    c: array = field(default_factory=lambda: array("I"))
+    d: array = field(default_factory=lambda: array("B"))
+
+    @classmethod
+    def from_instrs(cls, instrs: Iterable) -> "Program":
+        """Build a Program from Instr objects or views."""
+        program = cls()
+        for ins in instrs:
+            program.append(ins.A, ins.B, ins.C, ins.D)
+        return program
+
+    def __len__(self) -> int:
+        return len(self.ops)
+
+    def append(self, op: int, b: int, c: int, d: int = 0):
+        self.ops.append(op)
+        self.b.append(b & (_MASK23 if op == 4 else _MASK26))
+        self.c.append(c & _MASK26)
+        self.d.append(d & _MASK7 if op == 9 else 0)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return Program(self.ops[index], self.b[index], self.c[index], self.d[index])
+        if index < 0:
+            index += len(self.ops)
+        if not 0 <= index < len(self.ops):
+            raise IndexError("instruction index out of range")
+        return InstrView(self, index)
+
+    def __iter__(self) -> Iterator[InstrView]:
+        return map(InstrView, repeat(self), range(len(self.ops)))
@@ -0,0 +1,200 @@
+"""IR optimizer: constant propagation, BITREV folding and dead-store removal.
+
+Programs are straight-line and memory starts zeroed, so a forward pass can
+track the value of every cell whose address is known statically. LOAD,
+STORE and BITREV whose operands are all known become CONST when the value
+fits the 23-bit CONST immediate. A backward pass then drops instructions
+whose result is overwritten before anything reads it.
+
+Only instructions that provably cannot fault are rewritten or removed: all
+the addresses they touch must be known and below mem_size. Once an access
+may go out of range, the rest of the program is left untouched.
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional, Tuple, Union
+
+from bitutils import bitreverse64
+from model import Instr, Op, Program
+from predecode import OP_BITREV, OP_CONST, OP_STORE
+from vm import MEM_SIZE
+
+CONST_LIMIT = 1 << 23  # CONST B field width
+ADDRESS_MASK = (1 << 26) - 1  # B and C address fields
+OFFSET_MASK = (1 << 7) - 1  # BITREV D field
+
+UNKNOWN = None
+
+
+@dataclass
+class OptimizeStats:
+    folded: int = 0  # LOAD/STORE/BITREV turned into CONST
+    removed: int = 0  # dead stores dropped
+
+    def __str__(self) -> str:
+        return f"removed {self.removed} instructions, folded {self.folded}"
+
+
+@dataclass
+class _Effect:
+    reads: Optional[Tuple[int, ...]]  # None: may read any cell
+    write: Optional[int]  # None: writes an unknown cell (or nothing known)
+    safe: bool  # cannot fault, so may be removed
+
+
+class _Memory:
+    """Known cell values; cells missing from values hold `default`."""
+
+    def __init__(self, mem_size: int, assume_zero: bool):
+        self.mem_size = mem_size
+        self.values: dict = {}
+        self.default = 0 if assume_zero else UNKNOWN
+
+    def get(self, addr):
+        if addr is UNKNOWN:
+            return UNKNOWN
+        return self.values.get(addr, self.default)
+
+    def set(self, addr, value):
+        if addr is UNKNOWN:
+            # Could be anywhere: forget everything we knew.
+            self.values.clear()
+            self.default = UNKNOWN
+        else:
+            self.values[addr] = value
+
+
+def _const(value: int, addr: int) -> Instr:
+    return Instr(Op.CONST, 4, value, addr)
+
+
+# The passes work on the opcode/operand columns, so a compact Program is
+# never expanded into Instr objects. Each output entry is either the index
+# of an input instruction kept as is or a (value, address) CONST.
+Entry = Union[int, Tuple[int, int]]
+
+
+def _columns(program: List[Instr] | Program):
+    if isinstance(program, Program):
+        return program.ops, program.b, program.c, program.d
+    return (
+        [ins.A for ins in program],
+        [ins.B for ins in program],
+        [ins.C for ins in program],
+        [ins.D for ins in program],
+    )
+
+
+def _forward(columns, mem: _Memory, stats: OptimizeStats):
+    out: List[Entry] = []
+    effects: List[_Effect] = []
+
+    def out_of_range(*addrs) -> bool:
+        return any(a is not UNKNOWN and not 0 <= a < mem.mem_size for a in addrs)
+
+    ops, bs, cs, ds = columns
+    for index, (op, b, c, d) in enumerate(zip(ops, bs, cs, ds)):
+        # Fields are tracked exactly as the encoder will store them.
+        b, c = b & ADDRESS_MASK, c & ADDRESS_MASK
+        if op == OP_CONST:
+            if out_of_range(c):
+                break
+            mem.set(c, b & (CONST_LIMIT - 1))
+            out.append(index)
+            effects.append(_Effect((), c, True))
+            continue
+
+        if op == OP_STORE:
+            ptr = mem.get(b)
+            handle = mem.get(c)
+            write = mem.get(handle)
+            if out_of_range(b, c, ptr, handle, write):
+                break
+            reads = (b, ptr, c, handle)
+            value = mem.get(ptr)
+        else:
+            # LOAD and BITREV write a static cell from one indirect read.
+            ptr = mem.get(b)
+            src = ptr
+            if op == OP_BITREV and ptr is not UNKNOWN:
+                src = ptr + (d & OFFSET_MASK)
+            if out_of_range(b, c, src):
+                break
+            reads = (b, src)
+            write = c
+            value = mem.get(src)
+            if op == OP_BITREV and value is not UNKNOWN:
+                value = bitreverse64(value)
+
+        mem.set(write, value)
+        if UNKNOWN in reads or write is UNKNOWN:
+            # Touches a cell we cannot name: keep it and assume the worst.
+            out.append(index)
+            known_reads = None if UNKNOWN in reads else reads
+            effects.append(_Effect(known_reads, write, False))
+        elif value is not UNKNOWN and value < CONST_LIMIT:
+            stats.folded += 1
+            out.append((value, write))
+            effects.append(_Effect((), write, True))
+        else:
+            out.append(index)
+            effects.append(_Effect(reads, write, True))
+    else:
+        return out, effects
+
+    # Statically out of range: this instruction faults, keep the rest as is.
+    rest = range(index, len(ops))
+    return out + list(rest), effects + [_Effect(None, None, False)] * len(rest)
+
+
+def _remove_dead_stores(
+    out: List[Entry], effects: List[_Effect], stats: OptimizeStats
+) -> List[Entry]:
+    # dead: cells whose current value is overwritten before it is read.
+    # The final memory image reads every cell, so it starts empty.
+    dead: set = set()
+    keep = [True] * len(out)
+    for i in range(len(out) - 1, -1, -1):
+        effect = effects[i]
+        if effect.safe and effect.write in dead:
+            keep[i] = False
+            stats.removed += 1
+            continue
+        if effect.write is not None:
+            dead.add(effect.write)
+        if effect.reads is None:
+            dead.clear()
+        else:
+            dead.difference_update(effect.reads)
+    return [entry for entry, kept in zip(out, keep) if kept]
+
+
+def optimize(
+    program: List[Instr] | Program,
+    mem_size: int = MEM_SIZE,
+    assume_zero: bool = True,
+) -> Tuple[List[Instr] | Program, OptimizeStats]:
+    """Optimize a program; the final memory image is unchanged.
+
+    mem_size is the memory the program will run with; assume_zero=False
+    drops the assumption that memory starts zeroed (e.g. for snapshots).
+    A Program comes back as a Program, a list as a list. The analysis
+    still keeps one small effect record per instruction while it runs.
+    """
+    stats = OptimizeStats()
+    ops, bs, cs, ds = columns = _columns(program)
+    out, effects = _forward(columns, _Memory(mem_size, assume_zero), stats)
+    out = _remove_dead_stores(out, effects, stats)
+
+    if isinstance(program, Program):
+        result = Program()
+        for entry in out:
+            if isinstance(entry, int):
+                result.append(ops[entry], bs[entry], cs[entry], ds[entry])
+            else:
+                result.append(OP_CONST, *entry)
+        return result, stats
+    optimized = [
+        program[entry] if isinstance(entry, int) else _const(*entry) for entry in out
+    ]
+    return optimized, stats
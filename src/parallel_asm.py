@@ -0,0 +1,143 @@
+"""Multi-process assembler.
+
+Every source line assembles to exactly one 11-byte instruction (or to
+nothing), so the source is split into line-aligned byte ranges that worker
+processes parse and encode independently; the parts are concatenated in
+order afterwards.
+"""
+
+import io
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple
+
+from assembler_ir import AsmSyntaxError, iter_parse
+from atomic_file import atomic_write, mkstemp_beside
+from encode import write_program
+
+MIN_CHUNK_BYTES = 1 << 20  # smaller pieces are not worth a process
+_READ_BLOCK = 1 << 20
+
+
+def split_source(path: str, parts: int) -> List[Tuple[int, int]]:
+    """Split a file into at most `parts` byte ranges that end on a newline."""
+    size = os.path.getsize(path)
+    bounds = [0]
+    with open(path, "rb") as f:
+        for k in range(1, parts):
+            pos = max(size * k // parts, bounds[-1])
+            f.seek(pos)
+            f.readline()
+            cut = f.tell()
+            if cut >= size:
+                break
+            if cut > bounds[-1]:
+                bounds.append(cut)
+    bounds.append(size)
+    return list(zip(bounds, bounds[1:]))
+
+
+def count_lines(path: str, end: int) -> int:
+    """Number of line breaks (\\n, \\r\\n or a lone \\r, as text mode reads
+    them) in the first `end` bytes of path."""
+    count = 0
+    after_cr = False
+    with open(path, "rb") as f:
+        remaining = end
+        while remaining > 0:
+            block = f.read(min(_READ_BLOCK, remaining))
+            if not block:
+                break
+            count += block.count(b"\n") + block.count(b"\r") - block.count(b"\r\n")
+            if after_cr and block.startswith(b"\n"):
+                count -= 1  # \r\n split across two blocks
+            after_cr = block.endswith(b"\r")
+            remaining -= len(block)
+    return count
+
+
+class _RangeReader(io.RawIOBase):
+    """Raw reader over the `length` bytes at the current position of f,
+    at most _READ_BLOCK bytes per read."""
+
+    def __init__(self, f, length: int):
+        self._f = f
+        self._remaining = length
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buf) -> int:
+        with memoryview(buf) as view:
+            n = self._f.readinto(view[: min(len(view), self._remaining, _READ_BLOCK)])
+        self._remaining -= n
+        return n
+
+
+def _write_range(src: str, start: int, end: int, out) -> int:
+    with open(src, "rb", buffering=0) as f:
+        f.seek(start)
+        # Decode like the serial path's open(src, "r") so CRLF and lone CR
+        # line endings split into the same lines, holding one block of the
+        # range at a time. Line numbers are local to the range; the parent
+        # makes them global.
+        raw = io.BufferedReader(_RangeReader(f, end - start), _READ_BLOCK)
+        with io.TextIOWrapper(raw, encoding="utf-8") as lines:
+            return write_program(iter_parse(lines), out)
+
+
+def _assemble_range(src: str, start: int, end: int, part_path: str) -> int:
+    with open(part_path, "wb") as out:
+        return _write_range(src, start, end, out)
+
+
+def _concatenate(part_paths: List[str], out):
+    for part in part_paths:
+        with open(part, "rb") as f:
+            shutil.copyfileobj(f, out, _READ_BLOCK)
+
+
+def assemble_parallel(src: str, outbin: str, jobs: int) -> int:
+    """Assemble src into outbin using up to `jobs` worker processes.
+
+    Small sources fall back to a single range; syntax errors carry the
+    line number of the whole file, not of the worker's range.
+    """
+    parts = max(1, min(jobs, os.path.getsize(src) // MIN_CHUNK_BYTES))
+    ranges = split_source(src, parts)
+    if len(ranges) == 1:
+        # Not worth a process pool: assemble in this process.
+        start, end = ranges[0]
+        return atomic_write(outbin, lambda out: _write_range(src, start, end, out))
+    part_paths: List[str] = []
+
+    try:
+        # Unique names, so concurrent builds of the same output cannot
+        # clobber each other's parts.
+        for _ in ranges:
+            fd, part = mkstemp_beside(outbin, ".part")
+            os.close(fd)
+            part_paths.append(part)
+        with ProcessPoolExecutor(max_workers=min(jobs, len(ranges))) as pool:
+            futures = [
+                pool.submit(_assemble_range, src, start, end, part)
+                for (start, end), part in zip(ranges, part_paths)
+            ]
+            counts = []
+            for (start, _), future in zip(ranges, futures):
+                try:
+                    counts.append(future.result())
+                except AsmSyntaxError as exc:
+                    for pending in futures:
+                        pending.cancel()
+                    lineno = exc.lineno + count_lines(src, start)
+                    raise AsmSyntaxError(lineno, exc.message) from None
+
+        atomic_write(outbin, lambda out: _concatenate(part_paths, out))
+    finally:
+        for path in part_paths:
+            if os.path.exists(path):
+                os.unlink(path)
+
+    return sum(counts)
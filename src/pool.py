@@ -0,0 +1,85 @@
+"""Process pool that runs batches of assemble-and-run jobs on all cores."""
+
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from service import RequestError, parse_run_request, run_payload
+
+MAX_BATCH_JOBS = 1000
+
+
+def _init_worker():
+    # Loading this initializer already imported the assembler, engine and
+    # VM; run a trivial program so the first real job finds everything hot.
+    run_payload("CONST 0, 0", 0, 1)
+
+
+def _ping(_):
+    return os.getpid()
+
+
+def _run_job(job) -> dict:
+    payload, max_instructions, timeout = job
+    try:
+        asm_text, dump_start, dump_end = parse_run_request(payload)
+        return run_payload(asm_text, dump_start, dump_end, max_instructions, timeout)
+    except Exception as exc:
+        return {"error": str(exc)}
+
+
+def parse_batch_request(payload) -> list:
+    jobs = payload.get("jobs") if isinstance(payload, dict) else None
+    if not isinstance(jobs, list):
+        raise RequestError("jobs must be a list")
+    if len(jobs) > MAX_BATCH_JOBS:
+        raise RequestError(f"At most {MAX_BATCH_JOBS} jobs per batch")
+    return jobs
+
+
+class BatchRunner:
+    def __init__(self, workers: int | None = None):
+        self.workers = workers or os.cpu_count() or 1
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, initializer=_init_worker
+                )
+            return self._executor
+
+    def warm_up(self):
+        """Create the pool and wait for one round of trivial tasks.
+
+        This moves pool start-up out of the first batch. It does not
+        guarantee that every worker process has started: a fast worker may
+        take several of the warm-up tasks.
+        """
+        list(self.executor.map(_ping, range(self.workers)))
+
+    def run(
+        self,
+        jobs: list,
+        max_instructions: int | None = None,
+        timeout: float | None = None,
+    ) -> list[dict]:
+        """Run jobs in the pool and return their results in order.
+
+        Each job is an /api/run payload; failures are reported per job as
+        {"error": ...} entries.
+        """
+        if not jobs:
+            return []
+        chunksize = max(1, len(jobs) // (4 * self.workers))
+        work = [(job, max_instructions, timeout) for job in jobs]
+        return list(self.executor.map(_run_job, work, chunksize=chunksize))
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
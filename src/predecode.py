@@ -0,0 +1,53 @@
+from bitutils import bitreverse64
+from codec import decode_columns
+from model import Program
+from vm import VM
+
+# Opcodes are kept as the raw A nibble from the encoding.
+OP_CONST = 4
+OP_LOAD = 12
+OP_STORE = 3
+OP_BITREV = 9
+
+
+# The engines share the compact program container from model.
+PredecodedProgram = Program
+
+
+def predecode(code) -> PredecodedProgram:
+    """Decode a binary into a PredecodedProgram with the same rules as decode_instr.
+
+    code may be bytes or any buffer, e.g. the view from loader.map_binary.
+    A Program is already in this form and is returned as is.
+    """
+    if isinstance(code, Program):
+        return code
+    return PredecodedProgram(*decode_columns(code))
+
+
+def run_predecoded(
+    program: PredecodedProgram, vm: VM, start: int = 0, stop: int | None = None
+):
+    """Execute instructions [start, stop) of a pre-decoded program on vm.
+
+    Every value held in memory is already a 64-bit word, so the handlers
+    write straight into vm.mem instead of going through store_word.
+    """
+    mem = vm.mem
+    rev = bitreverse64
+
+    ops, bs, cs, ds = program.ops, program.b, program.c, program.d
+    if start or (stop is not None and stop < len(ops)):
+        window = slice(start, stop)
+        ops, bs, cs, ds = ops[window], bs[window], cs[window], ds[window]
+
+    for a, b, c, d in zip(ops, bs, cs, ds):
+        if a == OP_CONST:
+            mem[c] = b
+        elif a == OP_BITREV:
+            mem[c] = rev(mem[mem[b] + d])
+        elif a == OP_LOAD:
+            mem[c] = mem[mem[b]]
+        else:
+            value = mem[mem[b]]
+            mem[mem[mem[c]]] = value
@@ -0,0 +1,162 @@
+"""Opt-in execution profiler.
+
+Profiling is a separate backend, so the regular backends carry no
+instrumentation at all: a run without a Profile takes exactly the same code
+path as before. ProfileBackend executes the pre-decoded program with an
+instrumented copy of the run_predecoded loop.
+"""
+
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+
+from bitutils import bitreverse64
+from predecode import (
+    OP_BITREV,
+    OP_CONST,
+    OP_LOAD,
+    PredecodedProgram,
+    predecode,
+)
+from vm import VM
+
+MNEMONICS = {4: "CONST", 12: "LOAD", 3: "STORE", 9: "BITREV"}
+TOP_ADDRESSES = 10
+
+
+@dataclass
+class Profile:
+    op_counts: Counter = field(default_factory=Counter)
+    address_counts: Counter = field(default_factory=Counter)
+    reads: int = 0
+    writes: int = 0
+    timings: dict = field(default_factory=dict)  # phase -> seconds
+
+    @property
+    def instructions(self) -> int:
+        return sum(self.op_counts.values())
+
+    @property
+    def memory_accesses(self) -> int:
+        return self.reads + self.writes
+
+    def hottest(self, n: int = TOP_ADDRESSES) -> list:
+        return self.address_counts.most_common(n)
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.timings[name] = self.timings.get(name, 0.0) + elapsed
+
+    def timed_iter(self, name: str, iterable):
+        """Yield from iterable, charging the time spent producing items to name."""
+        iterator = iter(iterable)
+        while True:
+            with self.phase(name):
+                item = next(iterator, None)
+            if item is None:
+                return
+            yield item
+
+    def to_dict(self, top: int = TOP_ADDRESSES) -> dict:
+        return {
+            "instructions": self.instructions,
+            "opcodes": {MNEMONICS[op]: n for op, n in sorted(self.op_counts.items())},
+            "memoryAccesses": self.memory_accesses,
+            "reads": self.reads,
+            "writes": self.writes,
+            "hottestAddresses": [
+                {"address": addr, "accesses": n} for addr, n in self.hottest(top)
+            ],
+            "timings": dict(self.timings),
+        }
+
+    def format(self, top: int = TOP_ADDRESSES) -> str:
+        lines = [f"Instructions: {self.instructions}"]
+        for op, n in sorted(self.op_counts.items()):
+            lines.append(f"  {MNEMONICS[op]:<7} {n}")
+        lines.append(
+            f"Memory accesses: {self.memory_accesses} "
+            f"({self.reads} reads, {self.writes} writes)"
+        )
+        lines.append("Hottest addresses:")
+        for addr, n in self.hottest(top):
+            lines.append(f"  [{addr}] {n}")
+        lines.append("Timings:")
+        for name, seconds in self.timings.items():
+            lines.append(f"  {name:<8} {seconds * 1e3:.3f} ms")
+        return "\n".join(lines)
+
+
+def timed(profile: Profile | None, name: str):
+    """profile.phase(name), or a no-op context when not profiling."""
+    return nullcontext() if profile is None else profile.phase(name)
+
+
+class ProfileBackend:
+    """Instrumented stand-in for PredecodedBackend that fills a Profile."""
+
+    name = "profile"
+
+    def __init__(self, profile: Profile):
+        self.profile = profile
+
+    def load(self, code) -> PredecodedProgram:
+        with self.profile.phase("decode"):
+            return predecode(code)
+
+    def run(self, program: PredecodedProgram, vm: VM, start: int, stop: int):
+        mem = vm.mem
+        rev = bitreverse64
+        profile = self.profile
+        ops_seen = profile.op_counts
+        hits = profile.address_counts
+        reads = writes = 0
+
+        window = slice(start, stop)
+        ops, bs = program.ops[window], program.b[window]
+        cs, ds = program.c[window], program.d[window]
+
+        for a, b, c, d in zip(ops, bs, cs, ds):
+            ops_seen[a] += 1
+            if a == OP_CONST:
+                mem[c] = b
+                hits[c] += 1
+                writes += 1
+            elif a == OP_BITREV:
+                src = mem[b] + d
+                mem[c] = rev(mem[src])
+                hits[b] += 1
+                hits[src] += 1
+                hits[c] += 1
+                reads += 2
+                writes += 1
+            elif a == OP_LOAD:
+                src = mem[b]
+                mem[c] = mem[src]
+                hits[b] += 1
+                hits[src] += 1
+                hits[c] += 1
+                reads += 2
+                writes += 1
+            else:
+                src = mem[b]
+                value = mem[src]
+                ptr = mem[c]
+                dst = mem[ptr]
+                mem[dst] = value
+                hits[b] += 1
+                hits[src] += 1
+                hits[c] += 1
+                hits[ptr] += 1
+                hits[dst] += 1
+                reads += 4
+                writes += 1
+
+        profile.reads += reads
+        profile.writes += writes
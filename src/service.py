@@ -0,0 +1,218 @@
+"""Assemble-and-run service shared by the web front ends and worker processes."""
+
+import hashlib
+import json
+import time
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Tuple
+
+from assembler_ir import iter_parse_fields
+from engine import (
+    CHECK_INTERVAL,
+    BudgetExceeded,
+    DeadlineExceeded,
+    check_budget,
+    execute,
+    load,
+)
+from lru import LRUCache
+from model import Program
+from profiler import Profile, ProfileBackend, timed
+from vm import DUMP_CHUNK, VM
+
+MAX_INSTRUCTIONS = 1_000_000
+RUN_TIMEOUT = 5.0  # seconds
+
+# Programs take no input, so a (source, dump range) pair always gives the
+# same result. Sizes are counted in instructions and memory words.
+PROGRAM_CACHE = LRUCache(
+    max_entries=256, max_size=4_000_000, sizeof=lambda entry: len(entry.program)
+)
+RESULT_CACHE = LRUCache(max_entries=4096, max_size=4_000_000, sizeof=len)
+MAX_CACHED_WORDS = 65536
+
+
+@dataclass
+class CompiledSource:
+    program_ir: List[str]
+    program: object  # prepared by engine.load
+
+
+def parse_limited(
+    asm_text: str,
+    max_instructions: int | None = None,
+    deadline: float | None = None,
+) -> Program:
+    """Parse a source, enforcing the budget and deadline while parsing so an
+    oversized source is rejected before it is fully assembled."""
+    program = Program()
+    append = program.append
+    for count, fields in enumerate(iter_parse_fields(asm_text.splitlines()), 1):
+        if max_instructions is not None and count > max_instructions:
+            raise BudgetExceeded(
+                f"Program has more than {max_instructions} instructions"
+            )
+        if (
+            deadline is not None
+            and count % CHECK_INTERVAL == 0
+            and time.monotonic() > deadline
+        ):
+            raise DeadlineExceeded("Deadline exceeded while assembling")
+        append(*fields)
+    return program
+
+
+def compile_source(
+    asm_text: str,
+    max_instructions: int | None = None,
+    deadline: float | None = None,
+) -> Tuple[str, CompiledSource]:
+    key = hashlib.sha256(asm_text.encode("utf-8")).hexdigest()
+    entry = PROGRAM_CACHE.get(key)
+    if entry is None:
+        program = parse_limited(asm_text, max_instructions, deadline)
+        entry = CompiledSource([str(instr) for instr in program], load(program))
+        PROGRAM_CACHE.put(key, entry)
+    return key, entry
+
+
+def run_stream(
+    asm_text: str,
+    dump_start: int,
+    dump_end: int,
+    max_instructions: int | None = MAX_INSTRUCTIONS,
+    timeout: float | None = RUN_TIMEOUT,
+    profile: Profile | None = None,
+) -> Tuple[List[str], int, Iterator[List[int]]]:
+    """Assemble and run a program, returning its IR, the number of dumped
+    words and the dump itself in chunks.
+
+    Small results go through RESULT_CACHE; larger ones are streamed straight
+    from VM memory so they are never materialized as one list. A profiled
+    run always executes and bypasses the result cache.
+    """
+    if dump_start < 0 or dump_end <= dump_start:
+        raise ValueError("Dump start/end must satisfy 0 <= start < end.")
+
+    deadline = None if timeout is None else time.monotonic() + timeout
+
+    with timed(profile, "assemble"):
+        key, entry = compile_source(asm_text, max_instructions, deadline)
+    check_budget(entry.program, max_instructions)
+
+    result_key = (key, dump_start, dump_end)
+    fragment = RESULT_CACHE.get(result_key) if profile is None else None
+    if fragment is None:
+        vm = VM()
+        backend = "predecoded" if profile is None else ProfileBackend(profile)
+        with timed(profile, "execute"):
+            execute(entry.program, vm, backend, deadline=deadline)
+        if dump_end - dump_start > MAX_CACHED_WORDS:
+            count = max(0, min(dump_end, len(vm.mem)) - dump_start)
+            chunks = vm.iter_dump(dump_start, dump_end)
+            if profile is not None:
+                chunks = profile.timed_iter("dump", chunks)
+            return entry.program_ir, count, chunks
+        with timed(profile, "dump"):
+            fragment = vm.dump(dump_start, dump_end)
+        if profile is None:
+            RESULT_CACHE.put(result_key, fragment)
+
+    chunks = (
+        fragment[lo : lo + DUMP_CHUNK] for lo in range(0, len(fragment), DUMP_CHUNK)
+    )
+    return entry.program_ir, len(fragment), chunks
+
+
+def assemble_and_run(
+    asm_text: str,
+    dump_start: int,
+    dump_end: int,
+    max_instructions: int | None = MAX_INSTRUCTIONS,
+    timeout: float | None = RUN_TIMEOUT,
+) -> Tuple[List[str], List[int]]:
+    program_ir, _, chunks = run_stream(
+        asm_text, dump_start, dump_end, max_instructions, timeout
+    )
+    fragment = []
+    for chunk in chunks:
+        fragment.extend(chunk)
+    return program_ir, fragment
+
+
+class RequestError(ValueError):
+    """Malformed API request payload."""
+
+
+def parse_run_request(payload) -> Tuple[str, int, int]:
+    if not isinstance(payload, dict):
+        raise RequestError("Request must be a JSON object")
+
+    asm_text = payload.get("source", "")
+    if not isinstance(asm_text, str):
+        raise RequestError("source must be a string")
+
+    try:
+        dump_start = int(payload.get("dumpStart"))
+        dump_end = int(payload.get("dumpEnd"))
+    except (TypeError, ValueError):
+        raise RequestError("dumpStart and dumpEnd must be integers") from None
+
+    return asm_text, dump_start, dump_end
+
+
+def run_payload(
+    asm_text: str,
+    dump_start: int,
+    dump_end: int,
+    max_instructions: int | None = MAX_INSTRUCTIONS,
+    timeout: float | None = RUN_TIMEOUT,
+) -> dict:
+    program_ir, memory_fragment = assemble_and_run(
+        asm_text, dump_start, dump_end, max_instructions, timeout
+    )
+    return {
+        "program": program_ir,
+        "dumpStart": dump_start,
+        "dumpEnd": dump_end,
+        "memory": [
+            {"address": dump_start + idx, "value": value}
+            for idx, value in enumerate(memory_fragment)
+        ],
+    }
+
+
+def iter_run_json(
+    program_ir: List[str],
+    dump_start: int,
+    dump_end: int,
+    chunks: Iterable[List[int]],
+    profile: Profile | None = None,
+) -> Iterator[bytes]:
+    """Encode an /api/run response piece by piece.
+
+    The concatenated pieces equal json.dumps() of the run_payload() dict.
+    A profile is appended as a "profile" key once the dump has been sent.
+    """
+    head = json.dumps(
+        {"program": program_ir, "dumpStart": dump_start, "dumpEnd": dump_end}
+    )
+    yield (head[:-1] + ', "memory": [').encode("utf-8")
+
+    addr = dump_start
+    sep = ""
+    for chunk in chunks:
+        if not chunk:
+            continue
+        cells = ", ".join(
+            f'{{"address": {addr + idx}, "value": {value}}}'
+            for idx, value in enumerate(chunk)
+        )
+        yield (sep + cells).encode("utf-8")
+        sep = ", "
+        addr += len(chunk)
+
+    if profile is None:
+        yield b"]}"
+    else:
+        yield b'], "profile": ' + json.dumps(profile.to_dict()).encode() + b"}"
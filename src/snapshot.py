@@ -0,0 +1,175 @@
+"""Save and restore complete VM state (memory plus instruction pointer).
+
+Snapshot layout, all little-endian:
+
+    header   magic "UVMS", version, flags, page size, memory size, ip,
+             sha256 of the program binary (zeros if unknown)
+    pages    page number (u32) followed by the page's u64 words, repeated
+    trailer  CRC-32 of everything before it
+
+Only pages holding a non-zero word are stored, for dense and paged
+memory alike. The last page is cut short when the memory size is not a
+multiple of the page size.
+"""
+
+import os
+import struct
+import sys
+import zlib
+from array import array
+from typing import BinaryIO, Iterator, Tuple
+
+from atomic_file import atomic_write
+from memory import PAGE_SIZE, PagedMemory
+from vm import VM
+
+SNAPSHOT_MAGIC = b"UVMS"
+SNAPSHOT_VERSION = 1
+FLAG_PAGED = 1
+_HEADER = struct.Struct("<4sHHIQQ32s")
+_PAGE_NO = struct.Struct("<I")
+_CRC = struct.Struct("<I")
+NO_PROGRAM = bytes(32)
+
+
+def _page_size(vm: VM) -> int:
+    mem = vm.mem
+    return mem.page_size if isinstance(mem, PagedMemory) else PAGE_SIZE
+
+
+def iter_nonzero_pages(vm: VM) -> Iterator[Tuple[int, array]]:
+    """Yield (page number, words) for every page holding a non-zero word."""
+    mem = vm.mem
+    page_size = _page_size(vm)
+    if isinstance(mem, PagedMemory):
+        page_numbers = sorted(mem.pages)
+    else:
+        page_numbers = range(-(-len(mem) // page_size))
+
+    zero = bytes(8 * page_size)
+    for page_no in page_numbers:
+        lo = page_no * page_size
+        words = mem[lo : min(lo + page_size, len(mem))]
+        if words.tobytes() != zero[: 8 * len(words)]:
+            yield page_no, words
+
+
+def write_snapshot(vm: VM, f: BinaryIO, program_hash: bytes = NO_PROGRAM) -> int:
+    """Write a snapshot of vm to f and return the number of pages stored."""
+    flags = FLAG_PAGED if isinstance(vm.mem, PagedMemory) else 0
+    header = _HEADER.pack(
+        SNAPSHOT_MAGIC,
+        SNAPSHOT_VERSION,
+        flags,
+        _page_size(vm),
+        len(vm.mem),
+        vm.ip,
+        program_hash,
+    )
+    crc = zlib.crc32(header)
+    f.write(header)
+    count = 0
+    for page_no, words in iter_nonzero_pages(vm):
+        if sys.byteorder != "little":
+            words.byteswap()
+        data = _PAGE_NO.pack(page_no) + words.tobytes()
+        crc = zlib.crc32(data, crc)
+        f.write(data)
+        count += 1
+    f.write(_CRC.pack(crc))
+    return count
+
+
+def _read_into(f: BinaryIO, buf) -> int:
+    """Fill buf from f; returns the bytes read, short only at end of file."""
+    with memoryview(buf) as view, view.cast("B") as raw:
+        got = 0
+        while got < len(raw):
+            n = f.readinto(raw[got:])
+            if not n:
+                break
+            got += n
+        return got
+
+
+def read_snapshot(f: BinaryIO) -> Tuple[VM, bytes]:
+    """Rebuild a VM from a snapshot; returns (vm, program hash).
+
+    Pages are read one at a time, straight into the VM's memory.
+    """
+    header = f.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        raise ValueError("Truncated snapshot")
+    magic, version, flags, page_size, mem_size, ip, program_hash = (
+        _HEADER.unpack(header)
+    )
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError("Not a UVM snapshot")
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version {version}")
+
+    vm = VM(mem_size, bool(flags & FLAG_PAGED))
+    mem = vm.mem
+    if isinstance(mem, PagedMemory) and mem.page_size != page_size:
+        mem = vm.mem = PagedMemory(mem_size, page_size)
+    vm.ip = ip
+
+    crc = zlib.crc32(header)
+    while True:
+        # Either the next page number or, at the end, the CRC trailer.
+        tag = f.read(_PAGE_NO.size)
+        if len(tag) < _PAGE_NO.size:
+            raise ValueError("Truncated snapshot")
+        (page_no,) = _PAGE_NO.unpack(tag)
+        lo = page_no * page_size
+        n = min(page_size, mem_size - lo)
+        if n <= 0:
+            if f.read(1):
+                raise ValueError("Corrupt snapshot page table")
+            break
+        if isinstance(mem, PagedMemory):
+            words = array("Q", bytes(8 * n))
+            got = _read_into(f, words)
+        else:
+            with memoryview(mem) as view, view[lo : lo + n] as words:
+                got = _read_into(f, words)
+        if got == 0:
+            break
+        if got < 8 * n:
+            raise ValueError("Truncated snapshot")
+
+        crc = zlib.crc32(tag, crc)
+        if isinstance(mem, PagedMemory):
+            crc = zlib.crc32(words, crc)
+            if sys.byteorder != "little":
+                words.byteswap()
+            mem[lo : lo + n] = words
+        else:
+            with memoryview(mem) as view, view[lo : lo + n] as words:
+                crc = zlib.crc32(words, crc)
+            if sys.byteorder != "little":
+                words = mem[lo : lo + n]
+                words.byteswap()
+                mem[lo : lo + n] = words
+
+    (stored_crc,) = _CRC.unpack(tag)
+    if crc != stored_crc:
+        raise ValueError("Snapshot checksum mismatch")
+    return vm, program_hash
+
+
+def save_snapshot(vm: VM, path: str, program_hash: bytes = NO_PROGRAM) -> int:
+    """Write a snapshot atomically: a crash mid-write keeps the old file."""
+
+    def write(f: BinaryIO) -> int:
+        count = write_snapshot(vm, f, program_hash)
+        f.flush()
+        os.fsync(f.fileno())
+        return count
+
+    return atomic_write(path, write)
+
+
+def load_snapshot(path: str) -> Tuple[VM, bytes]:
+    with open(path, "rb") as f:
+        return read_snapshot(f)
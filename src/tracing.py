@@ -0,0 +1,243 @@
+"""Execution tracing into a fixed-size ring buffer, and trace replay.
+
+Every executed instruction produces one 36-byte record:
+
+    ip (u64), opcode (u8), address read (u32), address written (u32),
+    old value (u64), new value (u64)
+
+Records go into a preallocated bytearray. With a sink file the buffer is
+written out each time it fills, so the file holds the whole run; without
+one the buffer keeps only the most recent records, like a flight recorder.
+
+Because each record carries the old and new value of the cell it wrote,
+VM state at any instruction can be rebuilt by applying writes forward from
+zeroed memory, or by undoing them backward from a later state, without
+executing anything.
+
+    python3 src/tracing.py show trace.bin --start 100 --limit 20
+    python3 src/tracing.py replay trace.bin 5000 dump.json 0 64
+"""
+
+import argparse
+import struct
+from typing import BinaryIO, Iterable, Iterator, NamedTuple
+
+from bitutils import bitreverse64
+from dumpio import write_json
+from predecode import OP_BITREV, OP_CONST, OP_LOAD, PredecodedProgram, predecode
+from vm import ADDRESS_SPACE, MEM_SIZE, VM
+
+TRACE_MAGIC = b"UVMT"
+TRACE_VERSION = 1
+TRACE_BUFFER = 65536  # records held in memory
+NO_ADDRESS = 0xFFFFFFFF  # "address read" of CONST
+
+_FILE_HEADER = struct.Struct("<4sHH")  # magic, version, record size
+RECORD = struct.Struct("<QB3xIIQQ")
+
+MNEMONICS = {4: "CONST", 12: "LOAD", 3: "STORE", 9: "BITREV"}
+
+
+class TraceRecord(NamedTuple):
+    ip: int
+    op: int
+    read: int
+    written: int
+    old: int
+    new: int
+
+    def __str__(self) -> str:
+        read = "-" if self.read == NO_ADDRESS else self.read
+        return (
+            f"{self.ip}: {MNEMONICS.get(self.op, self.op)} read={read} "
+            f"[{self.written}] {self.old} -> {self.new}"
+        )
+
+
+class TraceRecorder:
+    """Ring buffer of trace records, optionally spilled to a sink file."""
+
+    def __init__(self, capacity: int = TRACE_BUFFER, sink: BinaryIO | None = None):
+        if capacity <= 0:
+            raise ValueError("Trace buffer needs room for at least one record")
+        self.capacity = capacity
+        self.buffer = bytearray(capacity * RECORD.size)
+        self.sink = sink
+        self.count = 0  # records recorded in total
+        self._flushed = 0  # records already written to the sink
+        if sink is not None:
+            sink.write(_FILE_HEADER.pack(TRACE_MAGIC, TRACE_VERSION, RECORD.size))
+
+    def _spill(self):
+        # Unflushed records start at the slot after the last flush and may
+        # wrap around the end of the buffer.
+        pending = self.count - self._flushed
+        start = self._flushed % self.capacity
+        first = min(pending, self.capacity - start)
+        size = RECORD.size
+        with memoryview(self.buffer) as view:
+            self.sink.write(view[start * size : (start + first) * size])
+            if pending > first:
+                self.sink.write(view[: (pending - first) * size])
+        self._flushed = self.count
+
+    def flush(self):
+        if self.sink is not None and self.count > self._flushed:
+            self._spill()
+            self.sink.flush()
+
+    def records(self) -> Iterator[TraceRecord]:
+        """Records still in the buffer, oldest first."""
+        kept = min(self.count - self._flushed, self.capacity)
+        first = (self.count - kept) % self.capacity
+        for k in range(kept):
+            slot = (first + k) % self.capacity
+            fields = RECORD.unpack_from(self.buffer, slot * RECORD.size)
+            yield TraceRecord._make(fields)
+
+    def write_to(self, f: BinaryIO):
+        """Save the buffered records in the trace file format."""
+        f.write(_FILE_HEADER.pack(TRACE_MAGIC, TRACE_VERSION, RECORD.size))
+        for record in self.records():
+            f.write(RECORD.pack(*record))
+
+
+class TraceBackend:
+    """Pre-decoded execution that records each instruction in a TraceRecorder."""
+
+    name = "trace"
+
+    def __init__(self, recorder: TraceRecorder):
+        self.recorder = recorder
+
+    def load(self, code) -> PredecodedProgram:
+        return predecode(code)
+
+    def run(self, program: PredecodedProgram, vm: VM, start: int, stop: int):
+        mem = vm.mem
+        rev = bitreverse64
+        recorder = self.recorder
+        buffer = recorder.buffer
+        pack_into = RECORD.pack_into
+        size = RECORD.size
+        capacity = recorder.capacity
+        spill = recorder._spill if recorder.sink is not None else None
+
+        window = slice(start, stop)
+        ops, bs = program.ops[window], program.b[window]
+        cs, ds = program.c[window], program.d[window]
+
+        count = recorder.count
+        slot = count % capacity
+        try:
+            for ip, a, b, c, d in zip(range(start, stop), ops, bs, cs, ds):
+                if a == OP_CONST:
+                    read, dst, new = NO_ADDRESS, c, b
+                elif a == OP_BITREV:
+                    read = mem[b] + d
+                    dst, new = c, rev(mem[read])
+                elif a == OP_LOAD:
+                    read = mem[b]
+                    dst, new = c, mem[read]
+                else:
+                    read = mem[b]
+                    new = mem[read]
+                    dst = mem[mem[c]]
+                old = mem[dst]
+                mem[dst] = new
+                pack_into(buffer, slot * size, ip, a, read, dst, old, new)
+                count += 1
+                slot += 1
+                if slot == capacity:
+                    slot = 0
+                    if spill is not None:
+                        recorder.count = count
+                        spill()
+        finally:
+            recorder.count = count
+
+
+def read_trace(f: BinaryIO) -> Iterator[TraceRecord]:
+    header = f.read(_FILE_HEADER.size)
+    if len(header) < _FILE_HEADER.size:
+        raise ValueError("Truncated trace file")
+    magic, version, record_size = _FILE_HEADER.unpack(header)
+    if magic != TRACE_MAGIC:
+        raise ValueError("Not a UVM trace")
+    if version != TRACE_VERSION or record_size != RECORD.size:
+        raise ValueError(f"Unsupported trace version {version}")
+    while True:
+        data = f.read(RECORD.size * 4096)
+        whole = len(data) - len(data) % RECORD.size
+        for fields in RECORD.iter_unpack(data[:whole]):
+            yield TraceRecord._make(fields)
+        if len(data) < RECORD.size * 4096:
+            return
+
+
+def replay(records: Iterable[TraceRecord], ip: int, vm: VM) -> VM:
+    """Apply the writes of every record before ip to vm (zeroed at ip 0)."""
+    mem = vm.mem
+    for record in records:
+        if record.ip >= ip:
+            break
+        mem[record.written] = record.new
+    vm.ip = ip
+    return vm
+
+
+def rewind(records: Iterable[TraceRecord], ip: int, vm: VM) -> VM:
+    """Undo, newest first, the writes of every record at or after ip."""
+    mem = vm.mem
+    for record in sorted(
+        (r for r in records if r.ip >= ip), key=lambda r: r.ip, reverse=True
+    ):
+        mem[record.written] = record.old
+    vm.ip = ip
+    return vm
+
+
+def main():
+    parser = argparse.ArgumentParser(description="UVM trace tool")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    show = sub.add_parser("show", help="Print trace records")
+    show.add_argument("trace")
+    show.add_argument("--start", type=int, default=0, help="First ip to print")
+    show.add_argument("--limit", type=int, default=100)
+
+    rebuild = sub.add_parser("replay", help="Dump VM memory as of an instruction")
+    rebuild.add_argument("trace")
+    rebuild.add_argument("ip", type=int, help="Instructions executed so far")
+    rebuild.add_argument("dump")
+    rebuild.add_argument("start", type=int)
+    rebuild.add_argument("end", type=int)
+    rebuild.add_argument("--mem-size", type=int)
+    rebuild.add_argument("--paged", action="store_true")
+    args = parser.parse_args()
+
+    with open(args.trace, "rb") as f:
+        records = read_trace(f)
+        if args.command == "show":
+            shown = 0
+            for record in records:
+                if record.ip < args.start:
+                    continue
+                if shown == args.limit:
+                    break
+                print(record)
+                shown += 1
+            return
+
+        mem_size = args.mem_size
+        if mem_size is None:
+            mem_size = ADDRESS_SPACE if args.paged else MEM_SIZE
+        vm = replay(records, args.ip, VM(mem_size, args.paged))
+
+    with open(args.dump, "w", encoding="utf-8") as f:
+        write_json(f, vm.iter_dump(args.start, args.end))
+    print(f"Memory at instruction {args.ip} dumped to {args.dump}")
+
+
+if __name__ == "__main__":
+    main()
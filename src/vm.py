@@ -1,12 +1,41 @@
+from array import array
+from typing import Iterator
+
+from memory import PagedMemory
+
 MEM_SIZE = 2048
+ADDRESS_SPACE = 1 << 26  # 26-bit addresses, see encode_BC
+WORD_MASK = (1 << 64) - 1
+DUMP_CHUNK = 65536  # words per chunk when streaming dumps
 
 
 class VM:
-    def __init__(self):
-        self.mem = [0] * MEM_SIZE
+    def __init__(self, mem_size: int = MEM_SIZE, paged: bool = False):
+        if not 0 < mem_size <= ADDRESS_SPACE:
+            raise ValueError(f"Memory size must be in 1..{ADDRESS_SPACE}")
+        if paged:
+            self.mem = PagedMemory(mem_size)
+        else:
+            self.mem = array("Q", [0]) * mem_size
+        self.ip = 0  # index of the next instruction to execute
 
     def load_word(self, addr: int) -> int:
         return self.mem[addr]
 
     def store_word(self, addr: int, value: int):
-        self.mem[addr] = value & ((1 << 64) - 1)
+        self.mem[addr] = value & WORD_MASK
+
+    def dump(self, start: int, end: int) -> list[int]:
+        return self.mem[start:end].tolist()
+
+    def iter_dump(
+        self, start: int, end: int, chunk_size: int = DUMP_CHUNK
+    ) -> Iterator[list[int]]:
+        """Yield the same words as dump(start, end) in lists of chunk_size."""
+        start, end, _ = slice(start, end).indices(len(self.mem))
+        for lo in range(start, end, chunk_size):
+            yield self.mem[lo : min(lo + chunk_size, end)].tolist()
+
+    def view(self) -> memoryview:
+        """Zero-copy view of the whole memory as u64 words (dense memory only)."""
+        return memoryview(self.mem)
@@ -0,0 +1,148 @@
+import asyncio
+import json
+import sys
+import unittest
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from aio_server import AsyncUVMServer
+
+
+async def read_response(reader):
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    headers = dict(line.split(": ", 1) for line in lines[1:] if line)
+    if headers.get("Transfer-Encoding") == "chunked":
+        body = b""
+        while True:
+            size = int(await reader.readuntil(b"\r\n"), 16)
+            body += (await reader.readexactly(size + 2))[:-2]
+            if size == 0:
+                break
+    else:
+        body = await reader.readexactly(int(headers["Content-Length"]))
+    return int(lines[0].split()[1]), headers, body
+
+
+class AsyncServerTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.app = AsyncUVMServer(ROOT / "web", max_inflight=2)
+        self.server = await self.app.start("127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def asyncTearDown(self):
+        self.server.close()
+        await self.server.wait_closed()
+        self.app.close()
+
+    async def test_keep_alive_serves_several_requests(self):
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        body = json.dumps({"source": "CONST 7, 1", "dumpStart": 0, "dumpEnd": 2})
+
+        for _ in range(2):
+            writer.write(
+                (
+                    "POST /api/run HTTP/1.1\r\nHost: x\r\n"
+                    f"Content-Length: {len(body)}\r\n\r\n{body}"
+                ).encode()
+            )
+            status, headers, data = await read_response(reader)
+            self.assertEqual(status, 200)
+            self.assertEqual(headers["Connection"], "keep-alive")
+            self.assertEqual(json.loads(data)["memory"][1]["value"], 7)
+
+        writer.write(b"GET /index.html HTTP/1.1\r\nConnection: close\r\n\r\n")
+        status, headers, data = await read_response(reader)
+        self.assertEqual((status, headers["Connection"]), (200, "close"))
+        self.assertIn(b"<html", data)
+        writer.close()
+
+    async def test_errors_and_unknown_paths(self):
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        writer.write(b"POST /api/run HTTP/1.1\r\nContent-Length: 2\r\n\r\n{}")
+        status, _, data = await read_response(reader)
+        self.assertEqual(status, 400)
+        self.assertIn("error", json.loads(data))
+
+        # A routine miss keeps the connection open.
+        for path in (b"/../web_server.py", b"/favicon.ico", b"/index\x00.html"):
+            writer.write(b"GET %s HTTP/1.1\r\n\r\n" % path)
+            status, headers, _ = await read_response(reader)
+            self.assertEqual((status, headers["Connection"]), (404, "keep-alive"))
+
+        writer.write(b"GET /index%2Ehtml HTTP/1.1\r\n\r\n")
+        status, _, data = await read_response(reader)
+        self.assertEqual(status, 200)
+        self.assertIn(b"<html", data)
+
+        writer.write(b"GET / HTTP/1.1\r\nContent-Length: x\r\n\r\n")
+        status, headers, _ = await read_response(reader)
+        self.assertEqual((status, headers["Connection"]), (400, "close"))
+        self.assertEqual(await reader.read(), b"")
+        writer.close()
+
+    async def test_truncated_body_is_rejected(self):
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        writer.write(b"POST /api/run HTTP/1.1\r\nContent-Length: 100\r\n\r\n{}")
+        writer.write_eof()
+        status, _, data = await read_response(reader)
+        self.assertEqual(status, 400)
+        self.assertIn("Truncated", json.loads(data)["error"])
+        writer.close()
+
+    async def test_batches_share_the_inflight_limit(self):
+        app = self.app
+        calls = []
+
+        class Runner:
+            def run(self, jobs, max_instructions, timeout):
+                calls.append(app._inflight._value)  # free execution slots
+                return [{"ok": True} for _ in jobs]
+
+        app.batch_runner = Runner()
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        body = json.dumps({"jobs": [{}]})
+        writer.write(
+            (
+                "POST /api/run-batch HTTP/1.1\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n{body}"
+            ).encode()
+        )
+        status, _, data = await read_response(reader)
+        self.assertEqual((status, json.loads(data)), (200, {"results": [{"ok": True}]}))
+        self.assertEqual(calls, [1])  # one of the two slots was held
+        writer.close()
+
+    async def test_batch_runner_failures_get_a_response(self):
+        class Runner:
+            def __init__(self, exc):
+                self.exc = exc
+
+            def run(self, jobs, max_instructions, timeout):
+                raise self.exc
+
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        body = json.dumps({"jobs": [{}]})
+        request = (
+            "POST /api/run-batch HTTP/1.1\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n{body}"
+        ).encode()
+        for exc, expected in (
+            (BrokenProcessPool("worker died"), 503),
+            (RuntimeError("boom"), 500),
+        ):
+            self.app.batch_runner = Runner(exc)
+            writer.write(request)
+            status, _, data = await read_response(reader)
+            self.assertEqual(status, expected)
+            self.assertIn("error", json.loads(data))
+        writer.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
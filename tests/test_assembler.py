@@ -1,14 +1,23 @@
+import io
+import pickle
 import sys
+import tempfile
 import unittest
 from pathlib import Path
+from unittest import mock
 
 ROOT = Path(__file__).resolve().parents[1]
 SRC = ROOT / "src"
 if str(SRC) not in sys.path:
     sys.path.insert(0, str(SRC))
 
-from assembler_ir import parse_program
-from encode import encode_program
+import parallel_asm
+from assembler import assemble_file
+from assembler_ir import AsmSyntaxError, iter_parse, parse_program
+from atomic_file import atomic_write
+from encode import encode_program, write_program
+from incremental import IncrementalAssembler
+from model import Op, Program
 
 
 class AssemblerEncodingTests(unittest.TestCase):
@@ -47,5 +56,208 @@ class AssemblerEncodingTests(unittest.TestCase):
         self.assertEqual(result, expected)
 
 
+class StreamingAssemblerTests(unittest.TestCase):
+    def test_streaming_matches_whole_program(self):
+        source = (ROOT / "examples" / "tests.asm").read_text(encoding="utf-8")
+        out = io.BytesIO()
+        count = write_program(iter_parse(io.StringIO(source)), out, batch=2)
+        self.assertEqual(count, len(parse_program(source)))
+        self.assertEqual(out.getvalue(), encode_program(parse_program(source)))
+
+    def test_errors_carry_line_numbers(self):
+        with self.assertRaises(AsmSyntaxError) as ctx:
+            list(iter_parse(["CONST 1, 2", "", "LOAD 1"], first_lineno=10))
+        self.assertEqual(ctx.exception.lineno, 12)
+        self.assertEqual(str(ctx.exception), "line 12: LOAD requires 2 arguments")
+        restored = pickle.loads(pickle.dumps(ctx.exception))
+        self.assertEqual(str(restored), str(ctx.exception))
+
+    def test_failed_build_leaves_no_output(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            src = Path(tmpdir) / "bad.asm"
+            out = Path(tmpdir) / "bad.bin"
+            src.write_text("CONST 1, 2\nBOGUS\n", encoding="utf-8")
+            with self.assertRaises(AsmSyntaxError):
+                assemble_file(str(src), str(out))
+            self.assertEqual(list(Path(tmpdir).iterdir()), [src])
+
+    def test_temporary_files_have_unique_names(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            src = Path(tmpdir) / "ok.asm"
+            out = Path(tmpdir) / "ok.bin"
+            other = Path(tmpdir) / "ok.bin.tmp"  # another build's staging file
+            src.write_text("CONST 1, 2\n", encoding="utf-8")
+            other.write_bytes(b"in progress")
+            assemble_file(str(src), str(out))
+            parallel_asm.assemble_parallel(str(src), str(out), 2)
+            self.assertEqual(other.read_bytes(), b"in progress")
+            self.assertEqual(out.stat().st_mode & 0o777, other.stat().st_mode & 0o777)
+            self.assertEqual(sorted(Path(tmpdir).iterdir()), [src, out, other])
+
+    def test_atomic_write_leaves_the_umask_and_old_output_alone(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            out = Path(tmpdir) / "out.bin"
+            out.write_bytes(b"old")
+
+            def fail(f):
+                f.write(b"half")
+                raise OSError("disk full")
+
+            with mock.patch("os.umask") as umask:
+                with self.assertRaises(OSError):
+                    atomic_write(str(out), fail)
+                self.assertEqual(atomic_write(str(out), lambda f: f.write(b"new")), 3)
+            umask.assert_not_called()
+            self.assertEqual(list(Path(tmpdir).iterdir()), [out])
+            self.assertEqual(out.read_bytes(), b"new")
+
+
+class ParallelAssemblerTests(unittest.TestCase):
+    def setUp(self):
+        self._min_chunk = parallel_asm.MIN_CHUNK_BYTES
+        parallel_asm.MIN_CHUNK_BYTES = 64
+
+    def tearDown(self):
+        parallel_asm.MIN_CHUNK_BYTES = self._min_chunk
+
+    def test_matches_single_process_output(self):
+        source = (ROOT / "examples" / "vec9.asm").read_text(encoding="utf-8")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            src = Path(tmpdir) / "vec9.asm"
+            out = Path(tmpdir) / "vec9.bin"
+            src.write_text(source, encoding="utf-8")
+            self.assertGreater(len(parallel_asm.split_source(str(src), 4)), 1)
+            count = parallel_asm.assemble_parallel(str(src), str(out), 4)
+            self.assertEqual(count, len(parse_program(source)))
+            self.assertEqual(out.read_bytes(), encode_program(parse_program(source)))
+            self.assertEqual(sorted(Path(tmpdir).iterdir()), [src, out])
+
+    def test_errors_report_global_line_numbers(self):
+        lines = ["CONST 1, 2 ; padding padding padding"] * 40 + ["BOGUS 1"]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            src = Path(tmpdir) / "bad.asm"
+            out = Path(tmpdir) / "bad.bin"
+            src.write_text("\n".join(lines) + "\n", encoding="utf-8")
+            with self.assertRaisesRegex(AsmSyntaxError, "^line 41: "):
+                parallel_asm.assemble_parallel(str(src), str(out), 4)
+            self.assertEqual(list(Path(tmpdir).iterdir()), [src])
+
+    def test_line_endings_match_serial_path(self):
+        lines = [f"CONST {i}, {i} ; padding padding padding" for i in range(40)]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            src = Path(tmpdir) / "crlf.asm"
+            serial, parallel = Path(tmpdir) / "a.bin", Path(tmpdir) / "b.bin"
+            for newline in ("\r\n", "\r", "\n\r"):
+                src.write_bytes(newline.join(lines).encode("utf-8"))
+                count = assemble_file(str(src), str(serial))
+                self.assertEqual(
+                    parallel_asm.assemble_parallel(str(src), str(parallel), 4), count
+                )
+                self.assertEqual(parallel.read_bytes(), serial.read_bytes())
+
+            src.write_bytes("\r\n".join(lines + ["BOGUS"]).encode("utf-8"))
+            with self.assertRaisesRegex(AsmSyntaxError, "^line 41: "):
+                parallel_asm.assemble_parallel(str(src), str(parallel), 4)
+            src.write_bytes("\r".join(lines + ["BOGUS"]).encode("utf-8"))
+            with self.assertRaisesRegex(AsmSyntaxError, "^line 41: "):
+                parallel_asm.assemble_parallel(str(src), str(parallel), 4)
+
+    def test_single_part_skips_the_pool(self):
+        parallel_asm.MIN_CHUNK_BYTES = 1 << 20
+        with tempfile.TemporaryDirectory() as tmpdir:
+            src = Path(tmpdir) / "small.asm"
+            out = Path(tmpdir) / "small.bin"
+            src.write_text("CONST 1, 2\nLOAD 2, 3\n", encoding="utf-8")
+            with mock.patch.object(parallel_asm, "ProcessPoolExecutor") as pool:
+                count = parallel_asm.assemble_parallel(str(src), str(out), 4)
+            pool.assert_not_called()
+            self.assertEqual(count, 2)
+            self.assertEqual(sorted(Path(tmpdir).iterdir()), [src, out])
+
+    def test_ranges_are_read_one_block_at_a_time(self):
+        source = (ROOT / "examples" / "vec9.asm").read_text(encoding="utf-8")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            src = Path(tmpdir) / "vec9.asm"
+            src.write_text(source, encoding="utf-8")
+            data = src.read_bytes()
+            start = data.index(b"\n") + 1
+            out = io.BytesIO()
+            reads = []
+            real = parallel_asm._RangeReader.readinto
+
+            def spy(reader, buf):
+                n = real(reader, buf)
+                reads.append(n)
+                return n
+
+            with mock.patch.object(parallel_asm, "_READ_BLOCK", 16):
+                with mock.patch.object(parallel_asm._RangeReader, "readinto", spy):
+                    count = parallel_asm._write_range(str(src), start, len(data), out)
+            self.assertLessEqual(max(reads), 16)
+            self.assertEqual(sum(reads), len(data) - start)
+            program = parse_program(data[start:].decode("utf-8"))
+            self.assertEqual(out.getvalue(), encode_program(program))
+            self.assertEqual(count, len(program))
+
+
+class IncrementalAssemblerTests(unittest.TestCase):
+    def test_only_changed_lines_are_reparsed(self):
+        source = (ROOT / "examples" / "vec9.asm").read_text(encoding="utf-8")
+        assembler = IncrementalAssembler()
+
+        program, binary = assembler.assemble(source)
+        self.assertEqual(program, parse_program(source))
+        self.assertEqual(binary, encode_program(program))
+
+        assembler.assemble(source)
+        self.assertEqual(assembler.reparsed, 0)
+
+        edited = source.replace("CONST 5,   104", "CONST 55,  104")
+        program, binary = assembler.assemble("CONST 1, 1\n" + edited)
+        self.assertEqual(assembler.reparsed, 2)
+        self.assertEqual(binary, encode_program(parse_program("CONST 1, 1\n" + edited)))
+
+    def test_errors_report_line_numbers(self):
+        with self.assertRaisesRegex(ValueError, "line 2: Unknown instruction NOPE"):
+            IncrementalAssembler().assemble("CONST 1, 1\nNOPE 1")
+
+
+class CompactProgramTests(unittest.TestCase):
+    SOURCE = "CONST 862, 457\nLOAD 317, 486\nSTORE 5, 6 ; comment\n\nBITREV 7, 3, 9\n"
+
+    def test_compact_parse_matches_instr_list(self):
+        program = parse_program(self.SOURCE, compact=True)
+        instrs = parse_program(self.SOURCE)
+        self.assertIsInstance(program, Program)
+        self.assertEqual(len(program), len(instrs))
+        self.assertEqual(list(program), instrs)
+        self.assertEqual([str(v) for v in program], [str(i) for i in instrs])
+        self.assertEqual(program[-1].op, Op.BITREV)
+        self.assertEqual(program[-1].D, 3)
+        self.assertEqual(encode_program(program), encode_program(instrs))
+        self.assertEqual(Program.from_instrs(instrs), program)
+
+    def test_write_program_and_slices(self):
+        program = parse_program(self.SOURCE, compact=True)
+        out = io.BytesIO()
+        self.assertEqual(write_program(program, out, batch=3), 4)
+        self.assertEqual(out.getvalue(), encode_program(program))
+        self.assertEqual(list(program[1:3]), parse_program(self.SOURCE)[1:3])
+        with self.assertRaises(IndexError):
+            program[4]
+
+    def test_syntax_errors_keep_line_numbers(self):
+        with self.assertRaises(AsmSyntaxError) as ctx:
+            parse_program("CONST 1, 2\nNOPE 1", compact=True)
+        self.assertEqual(ctx.exception.lineno, 2)
+
+    def test_out_of_range_operands_are_stored_as_encoded(self):
+        program = parse_program("CONST -1, 3\nLOAD 1, 67108865", compact=True)
+        self.assertEqual(program[0].B, (1 << 23) - 1)
+        self.assertEqual(program[1].C, 1)
+        instrs = parse_program("CONST -1, 3\nLOAD 1, 67108865")
+        self.assertEqual(encode_program(program), encode_program(instrs))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,80 @@
+import random
+import sys
+import unittest
+from array import array
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from assembler_ir import parse_program
+from batch_vm import HAVE_NUMPY, BatchVM, run_batch
+from encode import encode_program
+from engine import run_binary
+from vm import VM
+
+# Each lane's cell 0 points somewhere different, so LOAD/STORE/BITREV
+# addresses differ per lane.
+PROGRAM = """
+LOAD 0, 5
+BITREV 0, 3, 6
+CONST 40, 7
+STORE 1, 2
+BITREV 1, 0, 8
+""".strip()
+
+
+def random_images(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    images = []
+    for _ in range(n):
+        words = [rng.getrandbits(64) for _ in range(64)]
+        words[0] = rng.randrange(10, 60)  # pointer for LOAD/BITREV
+        words[1] = rng.randrange(10, 64)
+        words[2] = 3
+        words[3] = rng.randrange(10, 64)  # STORE target, via cell 2
+        images.append(words)
+    return images
+
+
+def reference(binary: bytes, images):
+    dumps = []
+    for words in images:
+        vm = VM(64)
+        vm.mem[0:64] = array("Q", words)
+        run_binary(binary, vm)
+        dumps.append(vm.dump(0, 64))
+    return dumps
+
+
+class BatchVMTests(unittest.TestCase):
+    def setUp(self):
+        self.binary = encode_program(parse_program(PROGRAM))
+        self.images = random_images(25)
+        self.expected = reference(self.binary, self.images)
+
+    def check(self, use_numpy: bool):
+        batch = run_batch(self.binary, self.images, 64, use_numpy)
+        self.assertEqual([batch.dump(i, 0, 64) for i in range(25)], self.expected)
+
+        bad = [list(words) for words in self.images]
+        bad[7][0] = 1 << 63
+        with self.assertRaisesRegex(IndexError, "lane 7"):
+            run_batch(self.binary, bad, 64, use_numpy)
+
+    def test_per_lane_fallback(self):
+        self.check(use_numpy=False)
+
+    @unittest.skipUnless(HAVE_NUMPY, "NumPy is not installed")
+    def test_numpy_lanes(self):
+        self.check(use_numpy=True)
+
+    def test_requires_lanes(self):
+        with self.assertRaises(ValueError):
+            BatchVM(0)
+
+
+if __name__ == "__main__":
+    unittest.main()
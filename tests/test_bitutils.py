@@ -0,0 +1,52 @@
+import random
+import sys
+import unittest
+from array import array
+from pathlib import Path
+from unittest import mock
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+import bitutils
+from bitutils import _bitreverse_slow, bitreverse64, bitreverse64_many
+
+
+class BitReverseTests(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(1234)
+        self.words = [0, 1, (1 << 64) - 1, 1 << 63] + [
+            rng.getrandbits(64) for _ in range(500)
+        ]
+
+    def test_table_matches_bit_loop(self):
+        for x in self.words:
+            self.assertEqual(bitreverse64(x), _bitreverse_slow(x, 64))
+
+    def test_bulk_matches_scalar(self):
+        expected = [bitreverse64(x) for x in self.words]
+        self.assertEqual(bitreverse64_many(self.words).tolist(), expected)
+
+        buf = array("Q", self.words).tobytes()
+        self.assertEqual(bitreverse64_many(buf).tolist(), expected)
+
+    def test_bulk_releases_buffer_views(self):
+        class FailingTable:
+            def __getitem__(self, index):
+                raise RuntimeError("lookup failed")
+
+        buf = bytearray(array("Q", self.words).tobytes())
+        with mock.patch.object(bitutils, "_REV16", FailingTable()):
+            try:
+                bitreverse64_many(buf)
+            except RuntimeError as exc:
+                caught = exc  # its traceback keeps the function's frame alive
+        buf.extend(bytes(8))  # BufferError while a view is still exported
+        del caught
+        self.assertEqual(bitreverse64_many(buf)[-1], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
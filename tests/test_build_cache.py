@@ -0,0 +1,133 @@
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+import assembler
+import atomic_file
+import build_cache
+import interpreter
+from assembler_ir import parse_program
+from build_cache import BuildCache, binary_key, source_key
+from encode import encode_program
+from predecode import predecode
+
+
+class BuildCacheTests(unittest.TestCase):
+    SOURCE = "CONST 5, 1\nLOAD 1, 2\nBITREV 1, 3, 4\n"
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+        self.src = self.dir / "prog.asm"
+        self.src.write_text(self.SOURCE)
+        self.cache_dir = self.dir / "cache"
+
+    def build(self, *extra) -> str:
+        argv = ["assembler.py", str(self.src), str(self.dir / "out.bin")]
+        argv += ["--cache-dir", str(self.cache_dir), *extra]
+        out = io.StringIO()
+        with mock.patch.object(sys, "argv", argv), contextlib.redirect_stdout(out):
+            assembler.main()
+        return out.getvalue()
+
+    def test_hit_skips_parsing_and_encoding(self):
+        self.assertIn("Compiled 3 instructions", self.build())
+        (self.dir / "out.bin").unlink()
+        with mock.patch.object(assembler, "assemble_file") as assemble_file:
+            self.assertIn("Cache hit: 3 instructions", self.build())
+        assemble_file.assert_not_called()
+        expected = encode_program(parse_program(self.SOURCE))
+        self.assertEqual((self.dir / "out.bin").read_bytes(), expected)
+
+    def test_key_covers_source_and_options(self):
+        key = source_key(str(self.src))
+        self.assertNotEqual(key, source_key(str(self.src), "-O 1024"))
+        self.src.write_text(self.SOURCE + "CONST 1, 1\n")
+        self.assertNotEqual(key, source_key(str(self.src)))
+
+        self.build()
+        self.assertIn("Optimizer", self.build("-O"))
+
+    def test_interpreter_reuses_predecoded_artifact(self):
+        self.build("--cache-predecoded")
+        cache = BuildCache(str(self.cache_dir))
+        binary = encode_program(parse_program(self.SOURCE))
+        program = cache.load_predecoded(binary_key(binary))
+        self.assertEqual(program, predecode(binary))
+        self.assertIsNone(cache.load_predecoded("0" * 64))
+
+        dump = self.dir / "dump.json"
+        args = (str(self.dir / "out.bin"), str(dump), 0, 8)
+        with mock.patch.object(interpreter, "predecode") as decode:
+            with contextlib.redirect_stdout(io.StringIO()):
+                interpreter.run_program(*args, cache=cache)
+        decode.assert_not_called()
+        cached_dump = dump.read_text()
+        with contextlib.redirect_stdout(io.StringIO()):
+            interpreter.run_program(*args)
+        self.assertEqual(dump.read_text(), cached_dump)
+
+    def test_fetch_stages_through_a_unique_temporary_file(self):
+        self.build()
+        names = []
+        real = atomic_file.mkstemp_beside
+
+        def spy(path, suffix=""):
+            fd, tmp_path = real(path, suffix)
+            names.append(tmp_path)
+            return fd, tmp_path
+
+        with mock.patch.object(atomic_file, "mkstemp_beside", spy):
+            self.assertIn("Cache hit", self.build())
+            self.assertIn("Cache hit", self.build())
+        self.assertEqual(len(set(names)), 2)
+        self.assertNotIn(str(self.dir / "out.bin.tmp"), names)
+        leftovers = sorted(p.name for p in self.dir.iterdir())
+        self.assertEqual(leftovers, ["cache", "out.bin", "prog.asm"])
+
+    def test_eviction_drops_least_recently_used(self):
+        cache = BuildCache(str(self.cache_dir), max_bytes=2 * 11 * 3)
+        binary = self.dir / "out.bin"
+        binary.write_bytes(encode_program(parse_program(self.SOURCE)))
+        for age, key in enumerate(["aa" * 32, "bb" * 32]):
+            cache.store(key, str(binary))
+            os.utime(cache.path(key), (1000 + age, 1000 + age))
+
+        self.assertEqual(cache.fetch("aa" * 32, str(binary)), 3)  # now newest
+        cache.store("cc" * 32, str(binary))
+        self.assertIsNone(cache.fetch("bb" * 32, str(binary)))
+        self.assertEqual(cache.fetch("aa" * 32, str(binary)), 3)
+        self.assertEqual(cache.fetch("cc" * 32, str(binary)), 3)
+        leftovers = [p for p in self.cache_dir.rglob("*") if p.suffix == ".tmp"]
+        self.assertEqual(leftovers, [])
+
+    def test_stale_temporary_files_are_counted_and_evicted(self):
+        cache = BuildCache(str(self.cache_dir))
+        stale = self.cache_dir / "aa" / "tmpcrashed.tmp"
+        fresh = self.cache_dir / "aa" / "tmpwriting.tmp"
+        stale.parent.mkdir()
+        stale.write_bytes(b"x" * 100)
+        fresh.write_bytes(b"x" * 50)
+        old = time.time() - build_cache.STALE_TMP_AGE - 1
+        os.utime(stale, (old, old))
+        self.assertEqual(sum(size for _, size, _ in cache.entries()), 150)
+
+        self.assertEqual(cache.evict(), 1)
+        self.assertFalse(stale.exists())
+        self.assertTrue(fresh.exists())  # may belong to a build still running
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import random
+import sys
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from codec import HAVE_NUMPY, decode_columns, encode_columns
+from decode import decode_instr, decode_program
+from encode import encode_instr
+from model import Instr, Op
+
+
+def random_program(n: int) -> list[Instr]:
+    rng = random.Random(7)
+    program = []
+    for _ in range(n):
+        op = rng.choice(list(Op))
+        if op == Op.CONST:
+            program.append(Instr(op, 4, rng.getrandbits(23), rng.getrandbits(26)))
+        elif op == Op.BITREV:
+            b, c, d = rng.getrandbits(26), rng.getrandbits(26), rng.getrandbits(7)
+            program.append(Instr(op, 9, b, c, d))
+        else:
+            code = 12 if op == Op.LOAD else 3
+            program.append(Instr(op, code, rng.getrandbits(26), rng.getrandbits(26)))
+    return program
+
+
+class BulkCodecTests(unittest.TestCase):
+    def setUp(self):
+        self.program = random_program(300)
+        self.binary = b"".join(encode_instr(ins) for ins in self.program)
+        self.columns = (
+            [ins.A for ins in self.program],
+            [ins.B for ins in self.program],
+            [ins.C for ins in self.program],
+            [ins.D for ins in self.program],
+        )
+
+    def check_backend(self, use_numpy: bool):
+        encoded = encode_columns(*self.columns, use_numpy=use_numpy)
+        self.assertEqual(encoded, self.binary)
+        decoded = decode_columns(self.binary + b"\x04", use_numpy=use_numpy)
+        self.assertEqual([col.tolist() for col in decoded], list(self.columns))
+        with self.assertRaises(ValueError):
+            decode_columns(bytes(11), use_numpy=use_numpy)
+        with self.assertRaises(ValueError):
+            encode_columns([5], [0], [0], [0], use_numpy=use_numpy)
+
+    def test_stdlib_codec(self):
+        self.check_backend(False)
+
+    @unittest.skipUnless(HAVE_NUMPY, "NumPy is not installed")
+    def test_numpy_codec(self):
+        self.check_backend(True)
+
+    @unittest.skipUnless(HAVE_NUMPY, "NumPy is not installed")
+    def test_numpy_masks_negative_and_wide_operands(self):
+        columns = ([4, 12, 9], [-1, -5, 1 << 70], [-2, 3, -1], [0, 0, -3])
+        self.assertEqual(
+            encode_columns(*columns, use_numpy=True),
+            encode_columns(*columns, use_numpy=False),
+        )
+
+    def test_decode_program_matches_decode_instr(self):
+        expected = [
+            decode_instr(self.binary[i : i + 11])
+            for i in range(0, len(self.binary), 11)
+        ]
+        self.assertEqual(decode_program(self.binary), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import sys
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from assembler_ir import parse_program
+from codegen import clear_cache, compile_binary, compile_program
+from encode import encode_program
+from predecode import predecode, run_predecoded
+from vm import VM
+
+
+class CodegenTests(unittest.TestCase):
+    def setUp(self):
+        clear_cache()
+        source = (ROOT / "examples" / "vec9.asm").read_text(encoding="utf-8")
+        self.program = parse_program(source)
+        self.binary = encode_program(self.program)
+
+    def test_blocks_match_interpreter(self):
+        expected = VM()
+        run_predecoded(predecode(self.binary), expected)
+
+        compiled = compile_program(self.program, block_size=3)
+        self.assertEqual(len(compiled.blocks), 7)
+        vm = VM()
+        compiled(vm.mem)
+        self.assertEqual(vm.mem, expected.mem)
+
+    def test_compiled_programs_are_cached(self):
+        first = compile_binary(self.binary)
+        self.assertIs(compile_binary(bytes(self.binary)), first)
+        self.assertIsNot(compile_binary(self.binary, block_size=5), first)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import io
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from dumpio import (
+    accepts_binary,
+    load_binary_dump,
+    write_binary,
+    write_json,
+    write_ndjson,
+)
+from service import iter_run_json, run_payload
+from vm import VM
+
+
+class StreamingDumpTests(unittest.TestCase):
+    def test_json_matches_json_dump(self):
+        words = list(range(10, 30))
+        for chunks in ([], [[]], [words], [words[:7], [], words[7:]]):
+            expected = json.dumps([w for c in chunks for w in c], indent=2)
+            out = io.StringIO()
+            write_json(out, chunks)
+            self.assertEqual(out.getvalue(), expected)
+
+    def test_ndjson_lines_carry_start_addresses(self):
+        vm = VM(64)
+        for addr in range(64):
+            vm.store_word(addr, addr * 3)
+
+        out = io.StringIO()
+        write_ndjson(out, vm.iter_dump(5, 30, chunk_size=10), 5)
+        lines = [json.loads(line) for line in out.getvalue().splitlines()]
+
+        self.assertEqual([line["start"] for line in lines], [5, 15, 25])
+        values = [v for line in lines for v in line["values"]]
+        self.assertEqual(values, vm.dump(5, 30))
+
+    def test_run_response_pieces_match_payload(self):
+        source = (ROOT / "examples" / "vec9.asm").read_text(encoding="utf-8")
+        payload = run_payload(source, 95, 215)
+        chunks = [payload["memory"][i : i + 50] for i in range(0, 120, 50)]
+        chunks = [[cell["value"] for cell in chunk] for chunk in chunks]
+
+        pieces = iter_run_json(payload["program"], 95, 215, chunks)
+        self.assertEqual(b"".join(pieces), json.dumps(payload).encode("utf-8"))
+
+
+class BinaryDumpTests(unittest.TestCase):
+    def test_round_trip_with_and_without_mmap(self):
+        words = [0, 1, (1 << 64) - 1, 1 << 63, 12345]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "dump.bin"
+            with path.open("wb") as f:
+                write_binary(f, [words[:2], words[2:]], 200, len(words))
+
+            self.assertEqual(path.stat().st_size, 24 + 8 * len(words))
+            self.assertEqual(path.read_bytes()[24:32], bytes(8))
+            self.assertEqual(path.read_bytes()[32:40], (1).to_bytes(8, "little"))
+
+            for use_mmap in (True, False):
+                with load_binary_dump(str(path), use_mmap) as dump:
+                    self.assertEqual((dump.start, dump.count), (200, len(words)))
+                    self.assertEqual(list(dump.words), words)
+
+            path.write_bytes(b"JUNK" + bytes(20))
+            with self.assertRaises(ValueError):
+                load_binary_dump(str(path))
+
+    def test_accept_header_negotiation(self):
+        self.assertTrue(accepts_binary("application/vnd.uvm.dump"))
+        self.assertTrue(
+            accepts_binary("application/json;q=0.5, application/octet-stream")
+        )
+        self.assertFalse(accepts_binary("application/octet-stream; q=0"))
+        self.assertFalse(
+            accepts_binary("application/json, application/vnd.uvm.dump;q=0")
+        )
+        self.assertFalse(
+            accepts_binary("application/json, application/octet-stream;q=0.9")
+        )
+        self.assertTrue(accepts_binary("application/vnd.uvm.dump, */*;q=0.8"))
+        self.assertTrue(accepts_binary("application/vnd.uvm.dump, */*"))
+        self.assertFalse(accepts_binary("*/*"))
+        self.assertFalse(accepts_binary("application/octet-stream;q=bogus"))
+        self.assertFalse(accepts_binary("application/json"))
+        self.assertFalse(accepts_binary(None))
+
+
+if __name__ == "__main__":
+    unittest.main()
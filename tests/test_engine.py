@@ -0,0 +1,87 @@
+import sys
+import time
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from assembler_ir import parse_program
+from decode import decode_program
+from encode import encode_program
+from engine import (
+    BACKENDS,
+    CHECK_INTERVAL,
+    BudgetExceeded,
+    DeadlineExceeded,
+    ExecutionCancelled,
+    execute,
+    load,
+    run_binary,
+)
+from model import Program
+from vm import VM
+
+
+def long_program(n: int) -> bytes:
+    lines = ["CONST 100, 10"]
+    for i in range(n - 1):
+        if i % 3 == 0:
+            lines.append(f"CONST {i}, {100 + i % 50}")
+        elif i % 3 == 1:
+            lines.append(f"BITREV 10, {i % 40}, {200 + i % 100}")
+        else:
+            lines.append(f"LOAD 10, {300 + i % 100}")
+    return encode_program(parse_program("\n".join(lines)))
+
+
+class EngineTests(unittest.TestCase):
+    def setUp(self):
+        self.binary = long_program(2 * CHECK_INTERVAL + 17)
+
+    def test_backends_agree_across_chunks(self):
+        images = []
+        for name in sorted(BACKENDS):
+            vm = VM()
+            count = run_binary(self.binary, vm, name, deadline=time.monotonic() + 60)
+            self.assertEqual(count, len(self.binary) // 11)
+            images.append(vm.dump(0, 400))
+        self.assertTrue(all(image == images[0] for image in images))
+
+    def test_backends_load_compact_programs(self):
+        program = decode_program(self.binary)
+        compact = Program.from_instrs(program)
+        for name in sorted(BACKENDS):
+            expected, vm = VM(), VM()
+            run_binary(self.binary, expected, name)
+            self.assertEqual(execute(load(compact, name), vm, name), len(program))
+            self.assertEqual(vm.dump(0, 400), expected.dump(0, 400))
+
+    def test_budget_is_checked_before_running(self):
+        vm = VM()
+        with self.assertRaises(BudgetExceeded):
+            run_binary(self.binary, vm, max_instructions=100)
+        self.assertEqual(vm.dump(0, 400), [0] * 400)
+
+    def test_deadline_and_cancel(self):
+        for name in BACKENDS:
+            program = load(self.binary, name)
+            with self.assertRaises(DeadlineExceeded):
+                execute(program, VM(), name, deadline=time.monotonic() - 1)
+
+            calls = []
+
+            def cancel():
+                calls.append(1)
+                return len(calls) > 1
+
+            vm = VM()
+            with self.assertRaises(ExecutionCancelled):
+                execute(program, vm, name, cancel=cancel)
+            self.assertEqual(vm.load_word(10), 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
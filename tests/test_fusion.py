@@ -0,0 +1,107 @@
+import random
+import sys
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from assembler_ir import parse_program
+from encode import encode_program
+from engine import execute, load, run_binary
+from fusion import execute_fused, fuse
+from predecode import predecode
+from vm import VM
+
+
+def images(source: str, mem_size: int = 512):
+    binary = encode_program(parse_program(source))
+    results = []
+    for backend in ("predecoded", "fused"):
+        vm = VM(mem_size)
+        try:
+            run_binary(binary, vm, backend)
+            results.append(vm.dump(0, mem_size))
+        except IndexError:
+            results.append(("fault", vm.dump(0, mem_size)))
+    return results
+
+
+class FusionTests(unittest.TestCase):
+    def test_vec9_is_fused(self):
+        source = (ROOT / "examples" / "vec9.asm").read_text(encoding="utf-8")
+        program = fuse(predecode(encode_program(parse_program(source))), 4096)
+        self.assertEqual([run.length for run in program.runs], [9, 9])
+        plain, fused = images(source)
+        self.assertEqual(fused, plain)
+
+    def test_runs_do_not_cross_chunk_boundaries(self):
+        source = "\n".join(f"CONST {i}, {i}" for i in range(20))
+        program = fuse(predecode(encode_program(parse_program(source))), 8)
+        runs = [(run.start, run.length) for run in program.runs]
+        self.assertEqual(runs, [(0, 8), (8, 8), (16, 4)])
+
+    def test_aliasing_and_faults_match_sequential(self):
+        cases = [
+            # destination overlaps the source vector from below and above
+            "CONST 100, 10\n"
+            + "".join(f"CONST {i + 1}, {100 + i}\n" for i in range(8))
+            + "".join(f"BITREV 10, {i}, {102 + i}\n" for i in range(6))
+            + "".join(f"BITREV 10, {i}, {98 + i}\n" for i in range(6)),
+            # the base pointer is overwritten by the run itself
+            "CONST 100, 12\n"
+            + "".join(f"BITREV 12, {i}, {10 + i}\n" for i in range(6)),
+            # gather whose pointers point into its own destination
+            "".join(f"CONST {301 + i}, {40 + i}\n" for i in range(6))
+            + "".join(f"LOAD {40 + i}, {300 + i}\n" for i in range(6)),
+            # runs that leave memory halfway through
+            "".join(f"CONST {i}, {508 + i}\n" for i in range(8)),
+            "CONST 500, 10\n"
+            + "".join(f"BITREV 10, {i}, {20 + i}\n" for i in range(20)),
+        ]
+        for source in cases:
+            plain, fused = images(source)
+            self.assertEqual(fused, plain, source)
+
+    def test_random_runs_match_sequential(self):
+        rng = random.Random(7)
+        for _ in range(200):
+            lines = []
+            for _ in range(10):
+                n = rng.randrange(1, 9)
+                b, c, d = rng.randrange(60), rng.randrange(60), rng.randrange(8)
+                kind = rng.randrange(4)
+                for k in range(n):
+                    if kind == 0:
+                        lines.append(f"CONST {rng.randrange(70)}, {c + k}")
+                    elif kind == 1:
+                        lines.append(f"BITREV {b}, {d + k}, {c + k}")
+                    elif kind == 2:
+                        lines.append(f"LOAD {b + k}, {c + k}")
+                    else:
+                        lines.append(f"STORE {b}, {c}")
+            plain, fused = images("\n".join(lines), 72)
+            self.assertEqual(fused, plain)
+
+    def test_partial_windows(self):
+        source = (ROOT / "examples" / "vec9.asm").read_text(encoding="utf-8")
+        binary = encode_program(parse_program(source))
+        expected = VM()
+        run_binary(binary, expected)
+
+        program = load(binary, "fused")
+        vm = VM()
+        for start in range(0, len(program), 3):
+            execute_fused(program, vm, start, min(start + 3, len(program)))
+        self.assertEqual(vm.dump(0, 300), expected.dump(0, 300))
+
+        vm, seen = VM(), []
+        execute(program, vm, "fused", checkpoint_every=5, on_checkpoint=seen.append)
+        self.assertEqual(len(seen), 3)
+        self.assertEqual(vm.dump(0, 300), expected.dump(0, 300))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -55,7 +55,9 @@ class InterpreterIntegrationTests(unittest.TestCase):
         program = parse_program(asm_source)
         return encode_program(program)
 
-    def run_and_dump(self, binary: bytes, start: int, end: int) -> list[int]:
+    def run_and_dump(
+        self, binary: bytes, start: int, end: int, backend: str = "predecoded"
+    ) -> list[int]:
         with tempfile.TemporaryDirectory() as tmpdir:
             bin_path = Path(tmpdir) / "program.bin"
             dump_path = Path(tmpdir) / "dump.json"
@@ -63,7 +65,9 @@ class InterpreterIntegrationTests(unittest.TestCase):
 
             buf = io.StringIO()
             with redirect_stdout(buf):
-                run_program(str(bin_path), str(dump_path), start, end)
+                run_program(
+                    str(bin_path), str(dump_path), start, end, backend=backend
+                )
 
             with dump_path.open("r", encoding="utf-8") as handle:
                 return json.load(handle)
@@ -79,6 +83,14 @@ class InterpreterIntegrationTests(unittest.TestCase):
         dump = self.run_and_dump(binary, 398, 402)
         self.assertEqual(dump[2], 123)
 
+    def test_compiled_backend_matches_predecoded(self):
+        source = (ROOT / "examples" / "tests.asm").read_text(encoding="utf-8")
+        binary = self.assemble_to_binary(source + "\n" + BITREV_PROGRAM)
+        self.assertEqual(
+            self.run_and_dump(binary, 0, 600, backend="compiled"),
+            self.run_and_dump(binary, 0, 600),
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,108 @@
+import random
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from assembler_ir import parse_program
+from encode import encode_program
+from engine import run_binary
+from model import InstrView, Program
+from optimizer import optimize
+from vm import VM
+
+
+def final_image(program, mem_size: int):
+    vm = VM(mem_size)
+    try:
+        run_binary(encode_program(program), vm)
+    except IndexError:
+        return "fault"
+    return vm.dump(0, mem_size)
+
+
+class OptimizerTests(unittest.TestCase):
+    def test_folds_and_removes(self):
+        program = parse_program(
+            """
+            CONST 7, 1      ; overwritten before it is read
+            CONST 50, 10
+            CONST 9, 50
+            LOAD 10, 20     ; m[20] = m[m[10]] = 9
+            CONST 8, 1
+            BITREV 10, 1, 21 ; m[51] is 0, so this folds too
+            """
+        )
+        expected = "CONST 50, 10\nCONST 9, 50\nCONST 9, 20\nCONST 8, 1\nCONST 0, 21"
+        optimized, stats = optimize(program)
+        self.assertEqual(optimized, parse_program(expected))
+        self.assertEqual((stats.folded, stats.removed), (2, 1))
+
+    def test_unknown_and_out_of_range_accesses_are_kept(self):
+        program = parse_program("CONST 3000, 5\nLOAD 5, 6\nCONST 1, 6")
+        optimized, stats = optimize(program)
+        self.assertEqual(optimized, program)
+        self.assertEqual((stats.folded, stats.removed), (0, 0))
+
+        program = parse_program("CONST 1, 7\nCONST 2, 7")
+        optimized, _ = optimize(program, assume_zero=False)
+        self.assertEqual(optimized, program[1:])
+
+    def test_compact_program_in_compact_program_out(self):
+        source = "CONST 7, 1\nCONST 50, 10\nCONST 9, 50\nLOAD 10, 20\nCONST 8, 1"
+        compact = parse_program(source, compact=True)
+        with mock.patch.object(InstrView, "__init__", side_effect=AssertionError):
+            optimized, stats = optimize(compact)  # works on the columns
+        self.assertIsInstance(optimized, Program)
+        expected, _ = optimize(parse_program(source))
+        self.assertEqual(list(optimized), expected)
+        self.assertEqual((stats.folded, stats.removed), (1, 1))
+
+    def test_out_of_range_operands_are_masked_like_the_encoder(self):
+        program = parse_program("CONST 2199023255552, 5\nCONST 5, 10\nBITREV 10, 0, 20")
+        optimized, _ = optimize(program, 1024)
+        self.assertEqual(final_image(optimized, 1024), final_image(program, 1024))
+        self.assertEqual(optimized[-1], parse_program("CONST 0, 20")[0])
+
+        program = parse_program("CONST -1, 5\nLOAD 5, 6")  # m[5] = 2**23 - 1
+        optimized, _ = optimize(program, 1024)
+        self.assertEqual(optimized, program)
+        self.assertEqual(final_image(program, 1024), "fault")
+
+    def test_random_programs_keep_final_image(self):
+        rng = random.Random(1234)
+
+        def immediate():
+            return rng.choice(
+                [rng.randrange(45), -rng.randrange(1, 4), (1 << 41) + rng.randrange(45)]
+            )
+
+        def address():
+            a = rng.randrange(40)
+            return rng.choice([a, a, a + (1 << 26), a - (1 << 26)])
+
+        for _ in range(300):
+            lines = []
+            for _ in range(40):
+                kind = rng.randrange(4)
+                a, b = address(), address()
+                if kind == 0:
+                    lines.append(f"CONST {immediate()}, {a}")
+                elif kind == 1:
+                    lines.append(f"LOAD {a}, {b}")
+                elif kind == 2:
+                    lines.append(f"STORE {a}, {b}")
+                else:
+                    lines.append(f"BITREV {a}, {rng.choice([0, 1, 3, 129])}, {b}")
+            program = parse_program("\n".join(lines))
+            optimized, _ = optimize(program, mem_size=44)
+            self.assertEqual(final_image(optimized, 44), final_image(program, 44))
+
+
+if __name__ == "__main__":
+    unittest.main()
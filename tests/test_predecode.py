@@ -0,0 +1,85 @@
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from assembler_ir import parse_program
+from decode import decode_instr
+from encode import encode_program
+from loader import iter_words, map_binary
+from predecode import predecode, run_predecoded
+from vm import VM
+
+
+STORE_PROGRAM = """
+CONST 300, 20
+CONST 123, 300
+CONST 500, 21
+CONST 400, 500
+STORE 20, 21
+""".strip()
+
+
+class PredecodeTests(unittest.TestCase):
+    def test_columns_match_decode_instr(self):
+        source = (ROOT / "examples" / "tests.asm").read_text(encoding="utf-8")
+        binary = encode_program(parse_program(source))
+        program = predecode(binary)
+
+        self.assertEqual(len(program), len(binary) // 11)
+        for i in range(len(program)):
+            instr = decode_instr(binary[i * 11 : (i + 1) * 11])
+            self.assertEqual(
+                (program.ops[i], program.b[i], program.c[i], program.d[i]),
+                (instr.A, instr.B, instr.C, instr.D),
+            )
+
+    def test_unknown_opcode_rejected(self):
+        with self.assertRaises(ValueError):
+            predecode(bytes(11))
+
+    def test_runs_store_program(self):
+        binary = encode_program(parse_program(STORE_PROGRAM))
+        vm = VM()
+        run_predecoded(predecode(binary), vm)
+        self.assertEqual(vm.mem[400], 123)
+
+    def test_mapped_binary_matches_bytes(self):
+        source = (ROOT / "examples" / "vec9.asm").read_text(encoding="utf-8")
+        binary = encode_program(parse_program(source))
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "program.bin"
+            path.write_bytes(binary + b"\x00\x01")  # trailing partial instruction
+            with map_binary(str(path)) as code:
+                words = list(iter_words(code))
+                program = predecode(code)
+
+            empty = Path(tmpdir) / "empty.bin"
+            empty.write_bytes(b"")
+            with map_binary(str(empty)) as code:
+                self.assertEqual(len(predecode(code)), 0)
+
+        self.assertEqual(words, list(iter_words(binary)))
+        self.assertEqual(program, predecode(binary))
+
+    def test_invalid_opcode_in_mapped_binary(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "bad.bin"
+            path.write_bytes(bytes(22))
+            with self.assertRaises(ValueError):
+                with map_binary(str(path)) as code:
+                    predecode(code)
+            with self.assertRaises(ValueError):
+                with map_binary(str(path)) as code:
+                    for word in iter_words(code):
+                        raise ValueError(f"bad word {word}")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import json
+import sys
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from assembler_ir import parse_program
+from encode import encode_program
+from engine import execute, load, run_binary
+from profiler import Profile, ProfileBackend
+from service import iter_run_json, run_stream
+from vm import VM
+
+
+class ProfilerTests(unittest.TestCase):
+    def setUp(self):
+        source = (ROOT / "examples" / "vec9.asm").read_text(encoding="utf-8")
+        self.source = source + "LOAD 10, 300\nCONST 7, 12\nSTORE 10, 12\n"
+        self.binary = encode_program(parse_program(self.source))
+
+    def test_counts_and_same_result_as_plain_run(self):
+        plain = VM()
+        run_binary(self.binary, plain)
+
+        profile = Profile()
+        backend = ProfileBackend(profile)
+        vm = VM()
+        execute(load(self.binary, backend), vm, backend)
+
+        self.assertEqual(vm.dump(0, 400), plain.dump(0, 400))
+        opcodes = profile.to_dict()["opcodes"]
+        self.assertEqual(opcodes, {"STORE": 1, "CONST": 12, "BITREV": 9, "LOAD": 1})
+        # CONST: 1 access, LOAD/BITREV: 3, STORE: 5
+        self.assertEqual(profile.memory_accesses, 12 + 3 * 10 + 5)
+        self.assertEqual(profile.writes, 23)
+        self.assertEqual(profile.hottest(1), [(10, 12)])
+        self.assertIn("decode", profile.timings)
+
+    def test_run_stream_reports_profile(self):
+        profile = Profile()
+        program_ir, _, chunks = run_stream(self.source, 200, 209, profile=profile)
+        payload = json.loads(
+            b"".join(iter_run_json(program_ir, 200, 209, chunks, profile))
+        )
+        self.assertEqual(payload["profile"]["instructions"], 23)
+        timings = payload["profile"]["timings"]
+        self.assertEqual(set(timings), {"assemble", "execute", "dump"})
+        self.assertEqual(len(payload["memory"]), 9)
+
+
+if __name__ == "__main__":
+    unittest.main()
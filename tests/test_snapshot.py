@@ -0,0 +1,146 @@
+import io
+import json
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from assembler_ir import parse_program
+from encode import encode_program
+from engine import BACKENDS, execute, load, run_binary
+from interpreter import run_program
+from snapshot import load_snapshot, read_snapshot, save_snapshot, write_snapshot
+from vm import ADDRESS_SPACE, VM
+
+
+def counter_program(n: int) -> bytes:
+    lines = ["CONST 100, 10"]
+    for i in range(n - 1):
+        if i % 2:
+            lines.append(f"BITREV 10, {i % 40}, {200 + i % 100}")
+        else:
+            lines.append(f"CONST {i}, {100 + i % 50}")
+    return encode_program(parse_program("\n".join(lines)))
+
+
+class SnapshotFormatTests(unittest.TestCase):
+    def test_round_trip_stores_only_nonzero_pages(self):
+        for vm in (VM(10_000), VM(ADDRESS_SPACE, paged=True)):
+            vm.store_word(5, 1)
+            vm.store_word(9_999, (1 << 64) - 1)
+            vm.mem[9_000] = 0  # allocated page that is all zeros again
+            vm.ip = 42
+
+            out = io.BytesIO()
+            self.assertEqual(write_snapshot(vm, out, b"h" * 32), 2)
+            self.assertLess(len(out.getvalue()), 8 * 2 * 4096 + 100)
+
+            restored, program_hash = read_snapshot(io.BytesIO(out.getvalue()))
+            self.assertEqual(program_hash, b"h" * 32)
+            self.assertEqual(type(restored.mem), type(vm.mem))
+            self.assertEqual((len(restored.mem), restored.ip), (len(vm.mem), 42))
+            self.assertEqual(restored.dump(0, 10_000), vm.dump(0, 10_000))
+
+    def test_corruption_is_detected(self):
+        vm = VM(64)
+        vm.store_word(3, 7)
+        out = io.BytesIO()
+        write_snapshot(vm, out)
+        data = bytearray(out.getvalue())
+        data[-10] ^= 1
+        with self.assertRaisesRegex(ValueError, "checksum"):
+            read_snapshot(io.BytesIO(bytes(data)))
+        with self.assertRaisesRegex(ValueError, "Not a UVM snapshot"):
+            read_snapshot(io.BytesIO(b"JUNK" + bytes(data[4:])))
+        for cut in (2, 20):
+            with self.assertRaisesRegex(ValueError, "Truncated"):
+                read_snapshot(io.BytesIO(bytes(data[:-cut])))
+
+    def test_pages_are_read_one_at_a_time(self):
+        class Reader(io.BytesIO):
+            def read(self, size=-1):
+                if size is None or size < 0:
+                    raise AssertionError("whole snapshot read at once")
+                return super().read(size)
+
+        for vm in (VM(20_000), VM(ADDRESS_SPACE, paged=True)):
+            for addr in (1, 5_000, 19_999):
+                vm.store_word(addr, addr)
+            out = io.BytesIO()
+            write_snapshot(vm, out)
+            restored, _ = read_snapshot(Reader(out.getvalue()))
+            self.assertEqual(restored.dump(0, 20_000), vm.dump(0, 20_000))
+
+
+class CheckpointTests(unittest.TestCase):
+    def setUp(self):
+        self.binary = counter_program(10_000)
+        self.expected = VM()
+        run_binary(self.binary, self.expected)
+
+    def test_resume_from_every_checkpoint(self):
+        for name in BACKENDS:
+            program = load(self.binary, name)
+            saved = []
+
+            def on_checkpoint(vm):
+                out = io.BytesIO()
+                write_snapshot(vm, out)
+                saved.append(out.getvalue())
+
+            execute(
+                program, VM(), name, checkpoint_every=3_000, on_checkpoint=on_checkpoint
+            )
+            self.assertEqual(len(saved), 3)
+
+            for data in saved:
+                vm, _ = read_snapshot(io.BytesIO(data))
+                self.assertEqual(vm.ip % 3_000, 0)
+                execute(program, vm, name)
+                self.assertEqual(vm.ip, len(program))
+                self.assertEqual(vm.dump(0, 400), self.expected.dump(0, 400))
+
+    def test_cli_resume_checks_program(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            bin_path = Path(tmpdir) / "prog.bin"
+            bin_path.write_bytes(self.binary)
+            ckpt = Path(tmpdir) / "run.ckpt"
+            dump = Path(tmpdir) / "dump.json"
+
+            with redirect_stdout(io.StringIO()):
+                run_program(
+                    str(bin_path),
+                    str(dump),
+                    0,
+                    400,
+                    checkpoint=str(ckpt),
+                    checkpoint_every=4_000,
+                )
+                vm, _ = load_snapshot(str(ckpt))
+                self.assertEqual(vm.ip, 8_000)
+
+                run_program(str(bin_path), str(dump), 0, 400, resume=str(ckpt))
+                expected = json.dumps(self.expected.dump(0, 400), indent=2)
+                self.assertEqual(dump.read_text(), expected)
+
+                bin_path.write_bytes(self.binary[:-11])
+                with self.assertRaisesRegex(ValueError, "different program"):
+                    run_program(str(bin_path), str(dump), 0, 400, resume=str(ckpt))
+
+            other = Path(tmpdir) / "run.ckpt.tmp"  # another run's staging file
+            other.write_bytes(b"in progress")
+            save_snapshot(VM(), str(ckpt))  # atomic rewrite leaves no .tmp file
+            self.assertEqual(other.read_bytes(), b"in progress")
+            other.unlink()
+            names = sorted(p.name for p in Path(tmpdir).iterdir())
+            self.assertEqual(names, ["dump.json", "prog.bin", "run.ckpt"])
+
+
+if __name__ == "__main__":
+    unittest.main()
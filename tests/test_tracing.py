@@ -0,0 +1,119 @@
+import gc
+import io
+import sys
+import tempfile
+import unittest
+import warnings
+from contextlib import redirect_stdout
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from assembler_ir import parse_program
+from encode import encode_program
+from engine import execute, load
+from interpreter import run_program
+from predecode import predecode, run_predecoded
+from tracing import (
+    NO_ADDRESS,
+    TraceBackend,
+    TraceRecorder,
+    read_trace,
+    replay,
+    rewind,
+)
+from vm import VM
+
+SOURCE = (ROOT / "examples" / "vec9.asm").read_text(encoding="utf-8") + (
+    "CONST 300, 20\nCONST 200, 300\nCONST 400, 21\nCONST 500, 400\nSTORE 20, 21\n"
+    "LOAD 10, 12\n"
+)
+
+
+def state_at(binary: bytes, ip: int) -> list:
+    vm = VM()
+    run_predecoded(predecode(binary), vm, 0, ip)
+    return vm.dump(0, 600)
+
+
+class TracingTests(unittest.TestCase):
+    def setUp(self):
+        self.binary = encode_program(parse_program(SOURCE))
+        self.length = len(self.binary) // 11
+
+    def test_file_trace_replays_every_instruction(self):
+        sink = io.BytesIO()
+        recorder = TraceRecorder(capacity=4, sink=sink)
+        backend = TraceBackend(recorder)
+        execute(load(self.binary, backend), VM(), backend)
+        recorder.flush()
+
+        records = list(read_trace(io.BytesIO(sink.getvalue())))
+        self.assertEqual([r.ip for r in records], list(range(self.length)))
+        self.assertEqual(records[0].read, NO_ADDRESS)
+        store = records[-2]
+        self.assertEqual((store.read, store.written, store.new), (300, 500, 200))
+
+        for ip in (0, 5, 11, 20, self.length):
+            vm = replay(records, ip, VM())
+            self.assertEqual(vm.dump(0, 600), state_at(self.binary, ip))
+
+    def test_ring_buffer_keeps_the_tail_and_rewinds(self):
+        recorder = TraceRecorder(capacity=8)
+        backend = TraceBackend(recorder)
+        vm = VM()
+        execute(load(self.binary, backend), vm, backend)
+
+        records = list(recorder.records())
+        self.assertEqual(recorder.count, self.length)
+        tail = list(range(self.length - 8, self.length))
+        self.assertEqual([r.ip for r in records], tail)
+
+        rewind(records, self.length - 8, vm)
+        self.assertEqual(vm.dump(0, 600), state_at(self.binary, self.length - 8))
+
+    def test_interpreter_flushes_trace_on_fault(self):
+        binary = encode_program(parse_program("CONST 1, 5\nCONST 9999, 6\nLOAD 6, 7"))
+        with tempfile.TemporaryDirectory() as tmpdir:
+            bin_path = Path(tmpdir) / "prog.bin"
+            bin_path.write_bytes(binary)
+            trace = Path(tmpdir) / "trace.bin"
+            dump = Path(tmpdir) / "d.json"
+            with redirect_stdout(io.StringIO()), self.assertRaises(IndexError):
+                run_program(str(bin_path), str(dump), 0, 8, trace=str(trace))
+            with trace.open("rb") as f:
+                self.assertEqual([r.ip for r in read_trace(f)], [0, 1])
+
+    def test_flush_then_continue_spills_only_new_records(self):
+        sink = io.BytesIO()
+        recorder = TraceRecorder(capacity=4, sink=sink)
+        backend = TraceBackend(recorder)
+        program = load(self.binary, backend)
+        vm = VM()
+        for start, stop in ((0, 3), (3, 6), (6, 11)):
+            backend.run(program, vm, start, stop)
+            recorder.flush()
+
+        records = list(read_trace(io.BytesIO(sink.getvalue())))
+        self.assertEqual([r.ip for r in records], list(range(11)))
+
+    def test_trace_file_is_closed_when_loading_fails(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            bin_path = Path(tmpdir) / "bad.bin"
+            bin_path.write_bytes(bytes(11))  # opcode 0
+            trace = Path(tmpdir) / "trace.bin"
+            dump = Path(tmpdir) / "d.json"
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter("always", ResourceWarning)
+                with self.assertRaises(ValueError):
+                    run_program(str(bin_path), str(dump), 0, 8, trace=str(trace))
+                gc.collect()
+            leaks = [w for w in caught if issubclass(w.category, ResourceWarning)]
+            self.assertEqual(leaks, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
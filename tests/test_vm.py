@@ -0,0 +1,67 @@
+import sys
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from memory import PagedMemory
+from vm import ADDRESS_SPACE, VM
+
+
+class VMMemoryTests(unittest.TestCase):
+    def test_store_masks_to_64_bits(self):
+        vm = VM()
+        vm.store_word(5, (1 << 64) + 7)
+        self.assertEqual(vm.load_word(5), 7)
+
+    def test_configurable_size_and_bounds(self):
+        vm = VM(16)
+        self.assertEqual(len(vm.mem), 16)
+        with self.assertRaises(IndexError):
+            vm.store_word(16, 1)
+        with self.assertRaises(ValueError):
+            VM(ADDRESS_SPACE + 1)
+
+    def test_dump_and_view(self):
+        vm = VM(8)
+        vm.store_word(3, 42)
+        self.assertEqual(vm.dump(2, 5), [0, 42, 0])
+
+        view = vm.view()
+        self.assertEqual(view.nbytes, 64)
+        view[4] = 9
+        self.assertEqual(vm.load_word(4), 9)
+
+
+class PagedMemoryTests(unittest.TestCase):
+    def test_full_address_space_is_lazy(self):
+        vm = VM(ADDRESS_SPACE, paged=True)
+        self.assertEqual(vm.mem.resident_pages, 0)
+        self.assertEqual(vm.load_word(ADDRESS_SPACE - 1), 0)
+
+        vm.store_word(1 << 20, 0)
+        self.assertEqual(vm.mem.resident_pages, 0)
+
+        vm.store_word(ADDRESS_SPACE - 1, 5)
+        vm.store_word(10, 6)
+        self.assertEqual(vm.mem.resident_pages, 2)
+        self.assertEqual(vm.load_word(ADDRESS_SPACE - 1), 5)
+        with self.assertRaises(IndexError):
+            vm.load_word(ADDRESS_SPACE)
+
+    def test_slices_cross_pages(self):
+        mem = PagedMemory(64, page_size=8)
+        mem[6:11] = [1, 2, 3, 4, 5]
+        self.assertEqual(mem[4:13].tolist(), [0, 0, 1, 2, 3, 4, 5, 0, 0])
+        self.assertEqual(mem.resident_pages, 2)
+
+        mem[32:48] = [0] * 16
+        self.assertEqual(mem.resident_pages, 2)
+        self.assertEqual(len(mem[60:100]), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
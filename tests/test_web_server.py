@@ -0,0 +1,158 @@
+import http.client
+import json
+import socket
+import sys
+import threading
+import time
+import unittest
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+for path in (ROOT, SRC):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+import web_server
+from engine import BudgetExceeded, DeadlineExceeded
+from lru import LRUCache
+from pool import BatchRunner
+from service import assemble_and_run, parse_limited
+
+
+class LRUCacheTests(unittest.TestCase):
+    def test_evicts_by_entries_and_size(self):
+        cache = LRUCache(max_entries=2, max_size=10, sizeof=len)
+        cache.put("a", [1] * 4)
+        cache.put("b", [1] * 4)
+        self.assertEqual(cache.get("a"), [1] * 4)
+        cache.put("c", [1] * 4)  # over size: evicts "b", the least recent
+        self.assertIsNone(cache.get("b"))
+        cache.put("huge", [1] * 11)  # never stored
+        self.assertIsNone(cache.get("huge"))
+
+        stats = cache.stats()
+        self.assertEqual((stats["entries"], stats["size"]), (2, 8))
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 2))
+        self.assertEqual(stats["evictions"], 1)
+
+
+class AssembleAndRunCacheTests(unittest.TestCase):
+    def setUp(self):
+        web_server.PROGRAM_CACHE.clear()
+        web_server.RESULT_CACHE.clear()
+        self.source = (ROOT / "examples" / "vec9.asm").read_text(encoding="utf-8")
+
+    def test_repeated_requests_hit_caches(self):
+        first = assemble_and_run(self.source, 200, 209)
+        second = assemble_and_run(self.source, 200, 209)
+        third = assemble_and_run(self.source, 100, 109)
+
+        self.assertEqual(first, second)
+        self.assertEqual(third[1], list(range(1, 10)))
+        self.assertEqual(web_server.PROGRAM_CACHE.stats()["hits"], 2)
+        self.assertEqual(web_server.RESULT_CACHE.stats()["hits"], 1)
+
+    def test_budget_applies_to_cached_results(self):
+        assemble_and_run(self.source, 200, 209)
+        with self.assertRaises(BudgetExceeded):
+            assemble_and_run(self.source, 200, 209, max_instructions=5)
+
+    def test_limits_apply_while_parsing(self):
+        source = "CONST 1, 1\n" * 100 + "BOGUS"
+        with self.assertRaises(BudgetExceeded):  # stops before the bad line
+            assemble_and_run(source, 0, 2, max_instructions=10)
+        with self.assertRaises(DeadlineExceeded):
+            parse_limited("CONST 1, 1\n" * 5000, deadline=time.monotonic() - 1)
+        self.assertEqual(len(web_server.PROGRAM_CACHE), 0)
+
+
+class RunEndpointTests(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(
+            ("127.0.0.1", 0), web_server.UVMRequestHandler
+        )
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.body = json.dumps({"source": "CONST 9, 3", "dumpStart": 2, "dumpEnd": 5})
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def post_run(self, headers=None):
+        conn = http.client.HTTPConnection(*self.server.server_address)
+        try:
+            conn.request("POST", "/api/run", self.body, headers or {})
+            response = conn.getresponse()
+            return response, response.read()
+        finally:
+            conn.close()
+
+    def test_run_response_is_chunked_json(self):
+        response, data = self.post_run()
+        self.assertEqual(response.getheader("Transfer-Encoding"), "chunked")
+        payload = json.loads(data)
+        self.assertEqual([cell["value"] for cell in payload["memory"]], [0, 9, 0])
+
+    def test_http10_clients_get_a_content_length_body(self):
+        with socket.create_connection(self.server.server_address) as sock:
+            sock.sendall(
+                (
+                    "POST /api/run HTTP/1.0\r\n"
+                    f"Content-Length: {len(self.body)}\r\n\r\n{self.body}"
+                ).encode()
+            )
+            raw = b""
+            while chunk := sock.recv(65536):
+                raw += chunk
+        head, _, body = raw.partition(b"\r\n\r\n")
+        self.assertNotIn(b"chunked", head)
+        self.assertIn(f"Content-Length: {len(body)}".encode(), head)
+        payload = json.loads(body)
+        self.assertEqual([cell["value"] for cell in payload["memory"]], [0, 9, 0])
+
+    def test_run_honours_binary_accept_header(self):
+        media_type = "application/vnd.uvm.dump"
+        response, data = self.post_run({"Accept": media_type})
+        self.assertEqual(response.getheader("Content-Type"), media_type)
+        self.assertEqual(data[:4], b"UVMD")
+        words = [int.from_bytes(data[i : i + 8], "little") for i in range(24, 48, 8)]
+        self.assertEqual(words, [0, 9, 0])
+
+
+class BatchRunnerTests(unittest.TestCase):
+    def test_results_come_back_in_order(self):
+        jobs = [
+            {"source": f"CONST {i}, 5", "dumpStart": 5, "dumpEnd": 6} for i in range(20)
+        ]
+        jobs.insert(3, {"source": "NOPE 1", "dumpStart": 0, "dumpEnd": 1})
+
+        runner = BatchRunner(workers=2)
+        try:
+            results = runner.run(jobs, max_instructions=100)
+        finally:
+            runner.shutdown()
+
+        self.assertIn("error", results[3])
+        values = [r["memory"][0]["value"] for r in results if "error" not in r]
+        self.assertEqual(values, list(range(20)))
+
+    def test_lazy_handler_runner_is_created_once(self):
+        handler = web_server.UVMRequestHandler
+        self.addCleanup(setattr, handler, "batch_runner", handler.batch_runner)
+        handler.batch_runner = None
+        runners = []
+        threads = [
+            threading.Thread(target=lambda: runners.append(handler._get_batch_runner()))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len({id(runner) for runner in runners}), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,12 +4,13 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
 import json
 import sys
+import threading
 from http import HTTPStatus
 from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
-from typing import List, Tuple
 
 BASE_DIR = Path(__file__).parent
 SRC_DIR = BASE_DIR / "src"
@@ -18,66 +19,47 @@ WEB_DIR = BASE_DIR / "web"
 if str(SRC_DIR) not in sys.path:
     sys.path.insert(0, str(SRC_DIR))
 
-from assembler_ir import parse_program
-from bitutils import bitreverse64
-from decode import decode_instr
-from encode import encode_program
-from model import Op
-from vm import VM
-
-INSTR_SIZE = 11
-
-
-def assemble_and_run(
-    asm_text: str, dump_start: int, dump_end: int
-) -> Tuple[List[str], List[int]]:
-    if dump_start < 0 or dump_end <= dump_start:
-        raise ValueError("Dump start/end must satisfy 0 <= start < end.")
-
-    program = parse_program(asm_text)
-    binary = encode_program(program)
-
-    vm = VM()
-    ip = 0
-    while ip + INSTR_SIZE <= len(binary):
-        raw = binary[ip : ip + INSTR_SIZE]
-        ip += INSTR_SIZE
-
-        instr = decode_instr(raw)
-
-        if instr.op == Op.CONST:
-            vm.store_word(instr.C, instr.B)
-        elif instr.op == Op.LOAD:
-            addr = vm.load_word(instr.B)
-            value = vm.load_word(addr)
-            vm.store_word(instr.C, value)
-        elif instr.op == Op.STORE:
-            addrB = vm.load_word(instr.B)
-            value = vm.load_word(addrB)
-            a1 = vm.load_word(instr.C)
-            a2 = vm.load_word(a1)
-            vm.store_word(a2, value)
-        elif instr.op == Op.BITREV:
-            base = vm.load_word(instr.B)
-            src_addr = base + instr.D
-            value = vm.load_word(src_addr)
-            vm.store_word(instr.C, bitreverse64(value))
-        else:
-            raise RuntimeError(f"Unknown op: {instr.op}")
-
-    fragment = vm.mem[dump_start:dump_end]
-
-    return [str(instr) for instr in program], fragment
+from aio_server import MAX_INFLIGHT, AsyncUVMServer
+from dumpio import BINARY_MEDIA_TYPE, accepts_binary, iter_binary_dump
+from pool import BatchRunner, parse_batch_request
+from profiler import Profile
+from service import (
+    MAX_INSTRUCTIONS,
+    PROGRAM_CACHE,
+    RESULT_CACHE,
+    RUN_TIMEOUT,
+    RequestError,
+    iter_run_json,
+    parse_run_request,
+    run_stream,
+)
 
 
 class UVMRequestHandler(SimpleHTTPRequestHandler):
     """Rudimentary API + static file handler."""
 
+    # HTTP/1.1 is needed for chunked /api/run responses.
+    protocol_version = "HTTP/1.1"
+
+    max_instructions: int | None = MAX_INSTRUCTIONS
+    run_timeout: float | None = RUN_TIMEOUT
+    batch_runner: BatchRunner | None = None
+    _batch_runner_lock = threading.Lock()
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, directory=str(WEB_DIR), **kwargs)
 
+    def do_GET(self):
+        if self.path == "/api/cache-stats":
+            self._send_json(
+                {"programs": PROGRAM_CACHE.stats(), "results": RESULT_CACHE.stats()},
+                HTTPStatus.OK,
+            )
+            return
+        super().do_GET()
+
     def do_POST(self):
-        if self.path != "/api/run":
+        if self.path not in ("/api/run", "/api/run-batch"):
             self.send_error(HTTPStatus.NOT_FOUND, "Unknown API endpoint")
             return
 
@@ -94,43 +76,80 @@ class UVMRequestHandler(SimpleHTTPRequestHandler):
             self._send_json({"error": "Invalid JSON payload"}, HTTPStatus.BAD_REQUEST)
             return
 
-        asm_text = payload.get("source", "")
-        dump_start = payload.get("dumpStart")
-        dump_end = payload.get("dumpEnd")
-
-        if not isinstance(asm_text, str):
-            self._send_json({"error": "source must be a string"}, HTTPStatus.BAD_REQUEST)
+        if self.path == "/api/run-batch":
+            self._run_batch(payload)
             return
 
         try:
-            dump_start = int(dump_start)
-            dump_end = int(dump_end)
-        except (TypeError, ValueError):
-            self._send_json(
-                {"error": "dumpStart and dumpEnd must be integers"},
-                HTTPStatus.BAD_REQUEST,
-            )
+            asm_text, dump_start, dump_end = parse_run_request(payload)
+        except RequestError as exc:
+            self._send_json({"error": str(exc)}, HTTPStatus.BAD_REQUEST)
             return
 
+        profile = Profile() if payload.get("profile") else None
         try:
-            program_ir, memory_fragment = assemble_and_run(
-                asm_text, dump_start, dump_end
+            program_ir, count, chunks = run_stream(
+                asm_text,
+                dump_start,
+                dump_end,
+                self.max_instructions,
+                self.run_timeout,
+                profile,
             )
         except Exception as exc:
             self._send_json({"error": str(exc)}, HTTPStatus.BAD_REQUEST)
             return
 
-        payload = {
-            "program": program_ir,
-            "dumpStart": dump_start,
-            "dumpEnd": dump_end,
-            "memory": [
-                {"address": dump_start + idx, "value": value}
-                for idx, value in enumerate(memory_fragment)
-            ],
-        }
+        if accepts_binary(self.headers.get("Accept")):
+            pieces = iter_binary_dump(chunks, dump_start, count)
+            self._send_chunked(pieces, BINARY_MEDIA_TYPE)
+        else:
+            pieces = iter_run_json(program_ir, dump_start, dump_end, chunks, profile)
+            self._send_chunked(pieces, "application/json; charset=utf-8")
 
-        self._send_json(payload, HTTPStatus.OK)
+    def _run_batch(self, payload):
+        try:
+            jobs = parse_batch_request(payload)
+        except RequestError as exc:
+            self._send_json({"error": str(exc)}, HTTPStatus.BAD_REQUEST)
+            return
+
+        results = self._get_batch_runner().run(
+            jobs, self.max_instructions, self.run_timeout
+        )
+        self._send_json({"results": results}, HTTPStatus.OK)
+
+    @classmethod
+    def _get_batch_runner(cls) -> BatchRunner:
+        # main() creates the runner up front; the lazy path is for servers
+        # built directly on the handler, where first requests may race.
+        with cls._batch_runner_lock:
+            if cls.batch_runner is None:
+                cls.batch_runner = BatchRunner()
+            return cls.batch_runner
+
+    def _send_chunked(self, pieces, content_type: str):
+        """Send a 200 response with chunked transfer encoding.
+
+        HTTP/1.0 clients cannot parse chunked bodies, so they get the
+        pieces joined into one Content-Length response instead.
+        """
+        if self.request_version != "HTTP/1.1":
+            data = b"".join(pieces)
+            self.send_response(HTTPStatus.OK)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+            return
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for piece in pieces:
+            self.wfile.write(b"%X\r\n%s\r\n" % (len(piece), piece))
+        self.wfile.write(b"0\r\n\r\n")
 
     def _send_json(self, payload, status: HTTPStatus):
         data = json.dumps(payload).encode("utf-8")
@@ -147,11 +166,66 @@ def main():
     )
     parser.add_argument("--host", default="127.0.0.1", help="Hostname to bind")
     parser.add_argument("--port", type=int, default=8000, help="Port to listen on")
+    parser.add_argument(
+        "--max-instructions",
+        type=int,
+        default=MAX_INSTRUCTIONS,
+        help="Reject programs longer than this many instructions",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=RUN_TIMEOUT,
+        help="Wall-clock limit for one execution in seconds",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes for /api/run-batch (default: CPU count)",
+    )
+    parser.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help="Use the asyncio front end (keep-alive, bounded executions)",
+    )
+    parser.add_argument(
+        "--max-inflight",
+        type=int,
+        default=MAX_INFLIGHT,
+        help="Concurrent VM executions in --async mode",
+    )
     args = parser.parse_args()
 
     if not WEB_DIR.is_dir():
         raise SystemExit(f"Static directory '{WEB_DIR}' is missing.")
 
+    batch_runner = BatchRunner(args.workers)
+    batch_runner.warm_up()
+
+    if args.use_async:
+        server = AsyncUVMServer(
+            WEB_DIR,
+            max_inflight=args.max_inflight,
+            max_instructions=args.max_instructions,
+            run_timeout=args.timeout,
+            batch_runner=batch_runner,
+        )
+        print(f"Serving UI on http://{args.host}:{args.port} (asyncio)")
+        print("Press Ctrl+C to stop.")
+        try:
+            asyncio.run(server.serve(args.host, args.port))
+        except KeyboardInterrupt:
+            print("\nShutting down...")
+        finally:
+            batch_runner.shutdown()
+        return
+
+    UVMRequestHandler.max_instructions = args.max_instructions
+    UVMRequestHandler.run_timeout = args.timeout
+    UVMRequestHandler.batch_runner = batch_runner
+
     server = ThreadingHTTPServer((args.host, args.port), UVMRequestHandler)
     print(f"Serving UI on http://{args.host}:{args.port}")
     print("Press Ctrl+C to stop.")
@@ -161,6 +235,7 @@ def main():
         print("\nShutting down...")
     finally:
         server.server_close()
+        batch_runner.shutdown()
 
 
 if __name__ == "__main__":